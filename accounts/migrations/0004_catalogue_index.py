@@ -0,0 +1,17 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_customuser_full_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', 'is_approved', 'date_joined', 'id'], name='user_role_listing_idx'),
+        ),
+    ]
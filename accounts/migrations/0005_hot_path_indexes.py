@@ -0,0 +1,17 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_catalogue_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('is_approved', False), ('role', 'instructor')), fields=['date_joined'], name='user_pending_instructor_idx'),
+        ),
+    ]
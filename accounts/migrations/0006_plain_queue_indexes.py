@@ -0,0 +1,17 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:33
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customuser',
+            name='user_pending_instructor_idx',
+        ),
+    ]
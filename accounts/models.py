@@ -17,10 +17,19 @@ class CustomUser(AbstractUser):
     education = models.CharField(max_length=100, blank=True, null=True)
     qualification = models.CharField(max_length=100, blank=True, null=True)
     profile_image = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # Name of the profile image whose resized variants exist (core.images).
+    profile_image_variants = models.CharField(max_length=100, blank=True, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination of the instructor listing (core.catalogue), and
+            # the admin queue of instructors awaiting approval.
+            models.Index(fields=['role', 'is_approved', 'date_joined', 'id'], name='user_role_listing_idx'),
+        ]
+
     def __str__(self):
         return f"{self.email} ({self.role})"
 
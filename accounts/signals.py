@@ -0,0 +1,29 @@
+from django.contrib.auth import models as auth_models
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from techademy.replicas import bookkeeping
+
+from .models import CustomUser
+from .user_cache import forget_user
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+# Stamping last_login is bookkeeping; it must not pin the user to the primary.
+user_logged_in.disconnect(dispatch_uid='update_last_login')
+
+
+@receiver(user_logged_in, dispatch_uid='update_last_login')
+def update_last_login(sender, user, **kwargs):
+    with bookkeeping():
+        auth_models.update_last_login(sender, user, **kwargs)
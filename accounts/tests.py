@@ -1,3 +1,80 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .models import CustomUser
+from .user_cache import user_cache_key
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        # Users are only cached in a store every worker shares.
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        overrides = override_settings(CACHES=dict(settings.CACHES, default={
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir,
+        }))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.student = CustomUser.objects.create_user(
+            username='student@example.com', email='student@example.com',
+            password='pass', role='student', is_approved=True, first_name='Old',
+        )
+        self.client.login(email='student@example.com', password='pass')
+
+    def queries(self, url, client=None):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual((client or self.client).get(url).status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_cached_user_and_cache_sessions_save_two_queries(self):
+        url = '/student/dashboard/'
+        self.queries(url)
+        with self.settings(USER_CACHE_TIMEOUT=0):
+            caches['default'].clear()
+            uncached = self.queries(url)
+
+        with self.settings(SESSION_ENGINE='django.contrib.sessions.backends.cache'):
+            # The session middleware picks its engine when the client starts.
+            client = Client()
+            client.login(email='student@example.com', password='pass')
+            self.queries(url, client)
+            cached = self.queries(url, client)
+        self.assertEqual(uncached - cached, 2)
+
+    def test_profile_edit_refreshes_cached_user(self):
+        self.client.get('/student/dashboard/')
+        self.assertIsNotNone(caches['default'].get(user_cache_key(self.student.id)))
+
+        self.client.post('/student/edit-profile/', {'first_name': 'New', 'last_name': '', 'email': 'student@example.com', 'phone': ''})
+        self.assertIsNone(caches['default'].get(user_cache_key(self.student.id)))
+        response = self.client.get('/student/dashboard/')
+        self.assertEqual(response.wsgi_request.user.first_name, 'New')
+
+    def test_password_change_ends_other_sessions(self):
+        self.client.get('/student/dashboard/')
+        self.student.set_password('changed')
+        self.student.save()
+
+        response = self.client.get('/student/dashboard/')
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_process_local_cache_is_not_used(self):
+        with override_settings(CACHES=dict(settings.CACHES, default={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        })):
+            self.client.get('/student/dashboard/')
+            self.assertIsNone(caches['default'].get(user_cache_key(self.student.id)))
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions(self):
+        self.client.login(email='student@example.com', password='pass')
+        response = self.client.get('/student/dashboard/')
+        self.assertEqual(response.wsgi_request.user, self.student)
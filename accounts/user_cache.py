@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+
+from techademy.cache import is_shared_cache
+
+
+# Authenticated users cached between requests.
+#
+# AuthenticationMiddleware loads request.user with one CustomUser query per
+# request. Here the user object is kept in the USER_CACHE_ALIAS cache next
+# to the session auth hash and backend it was verified with; a request
+# whose session carries the same hash gets the cached user without a query.
+# Changing the password changes the hash, so other sessions still go through
+# django.contrib.auth.get_user() and are logged out as usual. The
+# CustomUser signals in accounts.signals drop the entry on every save
+# (profile edits, approval, last_login). Those deletes must reach every
+# worker, or a deactivated user or a demoted role would stay cached on the
+# others for USER_CACHE_TIMEOUT, so users are only cached when
+# USER_CACHE_ALIAS is a shared store (techademy.cache.is_shared_cache).
+
+def _alias():
+    return getattr(settings, 'USER_CACHE_ALIAS', 'default')
+
+
+def _cache():
+    return caches[_alias()]
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    _cache().delete(user_cache_key(user_id))
+
+
+def forget_users(user_ids):
+    # For queryset.update(), which sends no post_save.
+    _cache().delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+def get_cached_user(request):
+    if not is_shared_cache(_alias()):
+        return auth.get_user(request)
+
+    session = request.session
+    try:
+        user_id = session[auth.SESSION_KEY]
+        backend = session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+
+    key = user_cache_key(user_id)
+    entry = _cache().get(key)
+    if entry is not None and session_hash and entry[:2] == (session_hash, backend):
+        user = entry[2]
+        user.backend = backend
+        return user
+
+    user = auth.get_user(request)
+    if user.is_authenticated and session_hash:
+        _cache().set(key, (session_hash, backend, user), getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+    return user
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = get_cached_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
@@ -0,0 +1,90 @@
+from django.db import transaction
+from django.db.models import Count, Q
+
+from accounts.models import CustomUser
+from accounts.user_cache import forget_users
+from core.page_cache import purge_courses, purge_instructors
+from instructor.models import Course
+from instructor.search import index_course
+
+
+# Admin moderation: dashboard counters, paginated queues and bulk actions.
+#
+# Bulk approvals and rejections are one UPDATE ... WHERE id IN (...) each.
+# queryset.update() sends no post_save, so the work the Course and
+# CustomUser signals would do (search index, catalogue cache, cached users)
+# is done here for the rows that actually changed.
+
+QUEUE_PAGE_SIZE = 25
+
+COURSE_STATUSES = ('pending', 'approved', 'rejected')
+INSTRUCTOR_STATUSES = ('pending', 'approved')
+
+
+def _courses(status):
+    return Count('course', filter=Q(course__approval_status=status))
+
+
+def dashboard_counters():
+    # One pass over instructors LEFT JOIN their courses; every course has
+    # exactly one instructor, so course rows are counted once.
+    return CustomUser.objects.filter(role='instructor').aggregate(
+        pending_instructors=Count('id', filter=Q(is_approved=False), distinct=True),
+        approved_instructors=Count('id', filter=Q(is_approved=True), distinct=True),
+        pending_courses=_courses('pending'),
+        approved_courses=_courses('approved'),
+        rejected_courses=_courses('rejected'),
+    )
+
+
+def course_queue(status='pending', query=''):
+    courses = Course.objects.filter(approval_status=status).select_related('instructor')
+    if query:
+        courses = courses.filter(
+            Q(title__icontains=query) | Q(category__icontains=query) | Q(instructor__email__icontains=query)
+        )
+    return courses.order_by('created_at', 'id')
+
+
+def instructor_queue(status='pending', query=''):
+    instructors = CustomUser.objects.filter(role='instructor', is_approved=(status == 'approved'))
+    if query:
+        instructors = instructors.filter(
+            Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(email__icontains=query)
+        )
+    return instructors.order_by('date_joined', 'id')
+
+
+def set_course_status(course_ids, status):
+    # Returns the number of courses whose status changed.
+    with transaction.atomic():
+        changed = Course.objects.select_for_update().filter(id__in=course_ids).exclude(approval_status=status)
+        changed_ids = list(changed.values_list('id', flat=True))
+        Course.objects.filter(id__in=changed_ids).update(approval_status=status)
+
+    if changed_ids:
+        for course in Course.objects.filter(id__in=changed_ids):
+            index_course(course)
+        purge_courses(changed_ids)
+    return len(changed_ids)
+
+
+def approve_instructors(user_ids):
+    with transaction.atomic():
+        pending = CustomUser.objects.select_for_update().filter(
+            id__in=user_ids, role='instructor', is_approved=False
+        )
+        changed_ids = list(pending.values_list('id', flat=True))
+        CustomUser.objects.filter(id__in=changed_ids).update(is_approved=True)
+
+    if changed_ids:
+        forget_users(changed_ids)
+        purge_instructors(changed_ids)
+    return len(changed_ids)
+
+
+def reject_instructors(user_ids):
+    # Rejected applications are deleted, as before; the delete cascades to
+    # their courses and sends the usual signals.
+    rejected = CustomUser.objects.filter(id__in=user_ids, role='instructor', is_approved=False)
+    return rejected.delete()[1].get(CustomUser._meta.label, 0)
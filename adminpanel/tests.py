@@ -1,3 +1,87 @@
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from accounts.models import CustomUser
+from instructor.models import Course
+from instructor.search import search_courses
+from .moderation import dashboard_counters
+
+
+class ModerationTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin@example.com', email='admin@example.com', password='pass', role='admin',
+        )
+        self.instructors = [
+            CustomUser.objects.create_user(
+                username=f't{i}@example.com', email=f't{i}@example.com', password='pass',
+                role='instructor', is_approved=i < 2,
+            )
+            for i in range(5)
+        ]
+        self.courses = [
+            Course.objects.create(
+                instructor=self.instructors[i % 2], title=f'Course {i}', description='', category='dev',
+                thumbnail='course_thumbnails/x.png', approval_status='approved' if i < 3 else 'pending',
+            )
+            for i in range(30)
+        ]
+        self.client.force_login(self.admin)
+
+    def moderate(self, **data):
+        return self.client.post('/adminpanel/moderate/', data)
+
+    def test_counters_are_one_query(self):
+        with self.assertNumQueries(1):
+            counters = dashboard_counters()
+        self.assertEqual(counters, {
+            'pending_instructors': 3, 'approved_instructors': 2,
+            'pending_courses': 27, 'approved_courses': 3, 'rejected_courses': 0,
+        })
+
+    def test_queues_are_paginated_and_filterable(self):
+        response = self.client.get('/adminpanel/')
+        self.assertEqual(len(response.context['page'].object_list), 25)
+        self.assertEqual(response.context['page'].paginator.count, 27)
+
+        response = self.client.get('/adminpanel/', {'tab': 'courses', 'status': 'approved', 'q': 'Course 1'})
+        self.assertEqual([c.title for c in response.context['page'].object_list], ['Course 1'])
+
+        response = self.client.get('/adminpanel/', {'tab': 'instructors', 'q': 't4@'})
+        self.assertEqual(list(response.context['page'].object_list), [self.instructors[4]])
+
+    def test_bulk_course_actions_are_single_updates(self):
+        ids = [str(course.id) for course in self.courses[3:23]]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.moderate(tab='courses', action='approve', ids=ids)
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "instructor_course"')]), 1)
+        self.assertEqual(Course.objects.filter(approval_status='approved').count(), 23)
+        self.assertRedirects(response, '/adminpanel/?tab=courses&status=pending&q=', fetch_redirect_response=False)
+        self.assertEqual(len(search_courses('Course 22')[:5]), 1)
+
+        self.moderate(tab='courses', status='approved', action=f'reject:{self.courses[22].id}')
+        self.assertEqual(Course.objects.filter(approval_status='rejected').count(), 1)
+        self.assertEqual(len(search_courses('Course 22')[:5]), 0)
+
+    def test_bulk_instructor_actions(self):
+        pending = [str(user.id) for user in self.instructors[2:]]
+        self.moderate(tab='instructors', action='approve', ids=pending[:2])
+        self.moderate(tab='instructors', action='reject', ids=pending[1:])
+        self.assertEqual(
+            list(CustomUser.objects.filter(role='instructor').values_list('is_approved', flat=True)),
+            [True, True, True, True],
+        )
+
+    def test_catalogue_cache_follows_bulk_approval(self):
+        self.client.logout()
+        self.assertNotContains(self.client.get('/student/courses/browse/'), 'Course 29')
+        self.client.force_login(self.admin)
+        self.moderate(tab='courses', action='approve', ids=[self.courses[29].id])
+        self.client.logout()
+        self.assertContains(self.client.get('/student/courses/browse/'), 'Course 29')
+
+    def test_get_cannot_moderate(self):
+        self.assertEqual(self.client.get('/adminpanel/moderate/').status_code, 405)
@@ -1,47 +1,66 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
+from urllib.parse import urlencode
+
 from django.contrib import messages
-from accounts.models import CustomUser
-from instructor.models import Course
+from django.core.paginator import Paginator
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 
-def admin_dashboard(request):
-    if not request.user.is_superuser:
-        return redirect('login')
+from techademy.replicas import read_replica
+from .moderation import (
+    COURSE_STATUSES, INSTRUCTOR_STATUSES, QUEUE_PAGE_SIZE, approve_instructors, course_queue,
+    dashboard_counters, instructor_queue, reject_instructors, set_course_status,
+)
 
-    pending_instructors = CustomUser.objects.filter(role='instructor', is_approved=False)
-    approved_instructors = CustomUser.objects.filter(role='instructor', is_approved=True)
+QUEUES = {
+    'courses': (course_queue, COURSE_STATUSES),
+    'instructors': (instructor_queue, INSTRUCTOR_STATUSES),
+}
 
-    pending_courses = Course.objects.filter(approval_status='pending')
-    approved_courses = Course.objects.filter(approval_status='approved')
 
-    return render(request, 'admin/admin_dashboard.html', {
-        'pending_instructors': pending_instructors,
-        'approved_instructors': approved_instructors,
-        'pending_courses': pending_courses,
-        'approved_courses': approved_courses,
-    })
+def _queue_params(data):
+    tab = data.get('tab') if data.get('tab') in QUEUES else 'courses'
+    statuses = QUEUES[tab][1]
+    status = data.get('status') if data.get('status') in statuses else statuses[0]
+    return tab, status, data.get('q', '').strip()
 
 
-def approve_instructor(request, user_id):
-    user = get_object_or_404(CustomUser, id=user_id, role='instructor')
-    user.is_approved = True
-    user.save()
-    return redirect('admin_dashboard')
+@read_replica
+def admin_dashboard(request):
+    tab, status, query = _queue_params(request.GET)
+    queue, statuses = QUEUES[tab]
+    page = Paginator(queue(status, query), QUEUE_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    return render(request, 'admin/admin_dashboard.html', {
+        'counters': dashboard_counters(),
+        'tab': tab,
+        'status': status,
+        'statuses': statuses,
+        'query': query,
+        'page': page,
+        'filters': urlencode({'tab': tab, 'status': status, 'q': query}),
+    })
 
-def reject_instructor(request, user_id):
-    user = get_object_or_404(CustomUser, id=user_id, role='instructor')
-    user.delete()
-    return redirect('admin_dashboard')
 
-def approve_course(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
-    course.approval_status = 'approved'
-    course.save()
-    return redirect('admin_dashboard')
+@require_POST
+def moderate(request):
+    # action is 'approve' or 'reject' for the checked rows, or
+    # 'approve:<id>' / 'reject:<id>' from a row's own button.
+    tab, status, query = _queue_params(request.POST)
+    action, _, single_id = request.POST.get('action', '').partition(':')
+    try:
+        ids = [int(single_id)] if single_id else [int(value) for value in request.POST.getlist('ids')]
+    except ValueError:
+        ids = []
 
-def reject_course(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
-    course.approval_status = 'rejected'
-    course.save()
-    return redirect('admin_dashboard')
+    if action not in ('approve', 'reject') or not ids:
+        messages.error(request, 'Select at least one row.')
+    elif tab == 'courses':
+        changed = set_course_status(ids, 'approved' if action == 'approve' else 'rejected')
+        messages.success(request, f"{'Approved' if action == 'approve' else 'Rejected'} {changed} course(s).")
+    elif action == 'approve':
+        messages.success(request, f"Approved {approve_instructors(ids)} instructor(s).")
+    else:
+        messages.success(request, f"Rejected {reject_instructors(ids)} instructor application(s).")
 
+    return redirect(f"{reverse('admin_dashboard')}?{urlencode({'tab': tab, 'status': status, 'q': query})}")
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import redirect
+
+
+# Role-based access rules for whole URL trees, checked once per request.
+#
+# settings.ACCESS_RULES maps a path prefix to the role allowed below it
+# ('admin' means a superuser); views named in settings.ACCESS_PUBLIC_VIEWS
+# (registration pages) are open to everyone. Anonymous users are sent to
+# the login page with ?next=, users with the wrong role to the login page,
+# as the per-view checks this replaces did.
+
+ROLE_CHECKS = {
+    'admin': lambda user: user.is_superuser,
+    'instructor': lambda user: user.role == 'instructor',
+    'student': lambda user: user.role == 'student',
+}
+
+
+def required_role(path, url_name=None):
+    if url_name in getattr(settings, 'ACCESS_PUBLIC_VIEWS', ()):
+        return None
+    for prefix, role in getattr(settings, 'ACCESS_RULES', ()):
+        if path.startswith(prefix):
+            return role
+    return None
+
+
+def has_role(user, role):
+    return user.is_authenticated and ROLE_CHECKS[role](user)
+
+
+class RoleAccessMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        role = required_role(request.path_info, match.url_name if match else None)
+        if role is None or has_role(request.user, role):
+            return None
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+        return redirect('login')
@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.core.signals import request_finished, request_started
+        from django.db.backends.signals import connection_created
+        from techademy.db import check_connection_health, configure_sqlite, mark_connections_idle
+
+        from . import signals  # noqa: F401
+
+        connection_created.connect(configure_sqlite, dispatch_uid='techademy.configure_sqlite')
+        request_started.connect(check_connection_health, dispatch_uid='techademy.check_connection_health')
+        request_finished.connect(mark_connections_idle, dispatch_uid='techademy.mark_connections_idle')
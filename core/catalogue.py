@@ -0,0 +1,57 @@
+from django.urls import reverse
+from django.utils.text import Truncator
+
+from accounts.models import CustomUser
+from instructor.models import Course
+from .images import image_sources
+from .pagination import keyset_page
+
+# Public course and instructor listings, paginated by keyset on
+# (created_at, id) for courses and (date_joined, id) for instructors.
+
+COURSES_PER_PAGE = 12
+INSTRUCTORS_PER_PAGE = 6
+COURSE_KEY = ('created_at', 'id')
+INSTRUCTOR_KEY = ('date_joined', 'id')
+
+
+def catalogue_courses():
+    return Course.objects.filter(approval_status='approved')
+
+
+def is_listed(course):
+    # The catalogue_courses() rule for one loaded course (search indexing).
+    return course.approval_status == 'approved'
+
+
+def catalogue_instructors():
+    return CustomUser.objects.filter(role='instructor', is_approved=True)
+
+
+def course_page(cursor=None, per_page=COURSES_PER_PAGE):
+    return keyset_page(catalogue_courses(), cursor, per_page, COURSE_KEY)
+
+
+def instructor_page(cursor=None, per_page=INSTRUCTORS_PER_PAGE):
+    return keyset_page(catalogue_instructors(), cursor, per_page, INSTRUCTOR_KEY)
+
+
+def course_card(course):
+    return {
+        'id': course.id,
+        'title': course.title,
+        'category': course.category,
+        'description': Truncator(course.description).chars(100),
+        'price': str(course.price),
+        'url': reverse('course_detail_student', args=[course.id]),
+        'image': image_sources(course.thumbnail),
+    }
+
+
+def instructor_card(instructor):
+    return {
+        'id': instructor.id,
+        'name': instructor.get_full_name(),
+        'qualification': instructor.qualification or '',
+        'image': image_sources(instructor.profile_image),
+    }
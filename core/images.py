@@ -0,0 +1,143 @@
+import logging
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db.models import F
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+# Resized derivatives of uploaded images (Course.thumbnail,
+# CustomUser.profile_image).
+#
+# Every width in VARIANT_WIDTHS is written as WebP and JPEG next to the
+# original, e.g. course_thumbnails/python.png gets
+# course_thumbnails/python.w320.webp and course_thumbnails/python.w320.jpg.
+# Names are derived from the original's, so templates build srcset lists
+# without a storage lookup: once a set is complete, the original's name is
+# recorded in the model's <field>_variants column, and an image counts as
+# having variants while that still matches. A new upload gets a new name,
+# so it is pending again until `manage.py build_image_variants` (run it from
+# cron every minute or so) builds it; uploads never wait on Pillow. Images
+# narrower than a width are not upscaled; that variant simply holds the
+# original size.
+
+VARIANT_WIDTHS = (160, 320, 640)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_name(name, width, ext):
+    root, _ = posixpath.splitext(name)
+    return f'{root}.w{width}.{ext}'
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def has_variants(field_file):
+    if not field_file:
+        return False
+    return getattr(field_file.instance, variants_field(field_file.field.name), '') == field_file.name
+
+
+def _variants_on_storage(field_file):
+    # The smallest JPEG is written last, so it marks a complete set.
+    return field_file.storage.exists(variant_name(field_file.name, min(VARIANT_WIDTHS), 'jpg'))
+
+
+def _record_variants(field_file):
+    # An UPDATE rather than save(): nothing else about the row changed. The
+    # caller purges whatever cached the old markup (build_image_variants).
+    instance, name = field_file.instance, variants_field(field_file.field.name)
+    setattr(instance, name, field_file.name)
+    type(instance)._default_manager.filter(pk=instance.pk).update(**{name: field_file.name})
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def _flatten(image):
+    # JPEG has no alpha channel: composite transparent images onto white.
+    rgba = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(rgba, mask=rgba.getchannel('A'))
+    return background
+
+
+def generate_variants(field_file, force=False):
+    # Returns the number of files written; 0 if they already exist or the
+    # original cannot be read as an image.
+    if not field_file or (not force and has_variants(field_file)):
+        return 0
+    if not force and _variants_on_storage(field_file):
+        _record_variants(field_file)
+        return 0
+
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name, 'rb') as fh:
+            original = ImageOps.exif_transpose(Image.open(fh))
+            original.load()
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.warning("Could not read %s to build image variants", field_file.name, exc_info=True)
+        return 0
+
+    if _has_alpha(original):
+        sources = {'WEBP': original.convert('RGBA'), 'JPEG': _flatten(original)}
+    else:
+        rgb = original.convert('RGB')
+        sources = {'WEBP': rgb, 'JPEG': rgb}
+
+    written = 0
+    for width in sorted(VARIANT_WIDTHS, reverse=True):
+        for ext, (fmt, options) in VARIANT_FORMATS.items():
+            resized = sources[fmt].copy()
+            resized.thumbnail((width, width * 10), Image.LANCZOS)
+
+            buffer = BytesIO()
+            resized.save(buffer, fmt, **options)
+            name = variant_name(field_file.name, width, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+            written += 1
+    _record_variants(field_file)
+    return written
+
+
+def with_image(model, field_name):
+    return model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+
+
+def pending_variants(model, field_name):
+    # Rows whose current image has no recorded variants.
+    return with_image(model, field_name).exclude(**{variants_field(field_name): F(field_name)})
+
+
+def variant_srcset(field_file, ext):
+    storage = field_file.storage
+    return ', '.join(
+        f'{storage.url(variant_name(field_file.name, width, ext))} {width}w' for width in VARIANT_WIDTHS
+    )
+
+
+def image_sources(field_file):
+    # URLs for rendering field_file responsively: {'src', 'webp_srcset', 'srcset'}.
+    if not field_file:
+        return None
+    if not has_variants(field_file):
+        return {'src': field_file.url, 'webp_srcset': '', 'srcset': ''}
+    return {
+        'src': field_file.storage.url(variant_name(field_file.name, 320, 'jpg')),
+        'webp_srcset': variant_srcset(field_file, 'webp'),
+        'srcset': variant_srcset(field_file, 'jpg'),
+    }
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import CustomUser
+from accounts.user_cache import forget_users
+from core.images import generate_variants, has_variants, pending_variants, variants_field, with_image
+from core.page_cache import purge_courses, purge_instructors
+from instructor.models import Course
+
+
+def _courses_built(courses):
+    purge_courses([course.id for course in courses])
+
+
+def _users_built(users):
+    forget_users([user.id for user in users])
+    instructors = [user.id for user in users if user.role == 'instructor' and user.is_approved]
+    if instructors:
+        purge_instructors(instructors)
+
+
+class Command(BaseCommand):
+    help = ('Generate resized WebP/JPEG variants for new course thumbnails and profile images. '
+            'Run it every minute or so.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist.')
+
+    def handle(self, *args, **options):
+        sources = (
+            ('course thumbnails', Course, 'thumbnail', (), _courses_built),
+            ('profile images', CustomUser, 'profile_image', ('role', 'is_approved'), _users_built),
+        )
+        for label, model, field_name, extra_fields, purge in sources:
+            queryset = with_image(model, field_name) if options['force'] else pending_variants(model, field_name)
+            built = []
+            for obj in queryset.only('id', field_name, variants_field(field_name), *extra_fields).iterator():
+                field_file = getattr(obj, field_name)
+                generate_variants(field_file, force=options['force'])
+                if has_variants(field_file):
+                    built.append(obj)
+            # Cached cards and users still hold the plain <img> markup.
+            if built:
+                purge(built)
+            self.stdout.write(f"Built variants for {len(built)} {label}.")
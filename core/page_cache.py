@@ -0,0 +1,110 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.http import HttpResponse
+
+from techademy.cache import is_shared_cache
+
+
+# Cached catalogue pages.
+#
+# Pages decorated with @cache_anonymous_page are stored whole, per view and
+# query string, for anonymous GET requests; everyone else renders them, but
+# the course and instructor cards inside come from {% cache %} fragments
+# keyed by object id (CARD_FRAGMENTS). Nothing waits for the TTL: the Course
+# and CustomUser signals in core.signals call purge_course() and
+# purge_instructor() when a public card changes, which drop that object's
+# fragments and move the listing pages to a new generation, so the next
+# visitor renders them again. Bulk updates send no signals and call
+# purge_courses() / purge_instructors() themselves. CATALOGUE_CACHE_TIMEOUT
+# only bounds how long an untouched page lives.
+#
+# A purge only reaches the workers that read the same store, so outside
+# DEBUG nothing is cached unless the default cache is shared (CACHE_URL).
+
+CATALOGUE_PAGES = ('homepage', 'browse_courses')
+CARD_FRAGMENTS = {
+    'course': ('home_course_card', 'browse_course_card'),
+    'instructor': ('home_instructor_card',),
+}
+GENERATION_TIMEOUT = 30 * 24 * 60 * 60
+
+
+def page_cache_enabled():
+    return settings.DEBUG or is_shared_cache()
+
+
+def cache_timeout():
+    # Also the {% cache %} timeout of the cards; 0 expires them at once.
+    if not page_cache_enabled():
+        return 0
+    return getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 600)
+
+
+def _generation_key(name):
+    return f'page:generation:{name}'
+
+
+def _page_key(name, generation, query_string):
+    digest = hashlib.md5('&'.join(sorted(query_string.split('&'))).encode()).hexdigest()
+    return f'page:{name}:{generation}:{digest}'
+
+
+def purge_pages(*names):
+    for name in names:
+        key = _generation_key(name)
+        if not cache.add(key, 1, GENERATION_TIMEOUT):
+            try:
+                cache.incr(key)
+            except ValueError:  # expired in between
+                cache.set(key, 1, GENERATION_TIMEOUT)
+
+
+def _purge_cards(kind, object_ids):
+    cache.delete_many([
+        make_template_fragment_key(name, [object_id])
+        for object_id in object_ids for name in CARD_FRAGMENTS[kind]
+    ])
+
+
+def purge_courses(course_ids):
+    _purge_cards('course', course_ids)
+    purge_pages(*CATALOGUE_PAGES)
+
+
+def purge_course(course_id):
+    purge_courses([course_id])
+
+
+def purge_instructors(user_ids):
+    _purge_cards('instructor', user_ids)
+    purge_pages(*CATALOGUE_PAGES)
+
+
+def purge_instructor(user_id):
+    purge_instructors([user_id])
+
+
+def cache_anonymous_page(view):
+    name = view.__name__
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated or not page_cache_enabled():
+            return view(request, *args, **kwargs)
+
+        generation = cache.get(_generation_key(name), 0)
+        key = _page_key(name, generation, request.META.get('QUERY_STRING', ''))
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            cache.set(key, (response.content, response['Content-Type']), cache_timeout())
+        return response
+    return wrapper
@@ -0,0 +1,83 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+# Keyset ("cursor") pagination, newest first.
+#
+# A page is the next `per_page` rows after the last row of the previous
+# page in (created_at, id) order, so the database seeks straight to the
+# cursor through the matching index instead of counting past OFFSET rows:
+# page 500 costs the same as page 1. The cursor is the last row's key,
+# JSON-encoded in URL-safe base64. There is no total count and no jumping
+# to an arbitrary page number; clients only follow next_cursor.
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return not self.cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _key_value(value):
+    # Full isoformat: DjangoJSONEncoder would truncate to milliseconds and
+    # skip rows created within the same millisecond.
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def encode_cursor(obj, fields):
+    key = json.dumps([_key_value(getattr(obj, name)) for name in fields])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, fields):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(key, list) or len(key) != len(fields):
+            raise InvalidCursor(cursor)
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(fields, key)]
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def _after(fields, values):
+    # (a, b) < (x, y) spelled as a < x OR (a = x AND b < y), which every
+    # backend can satisfy with an index range scan.
+    condition = Q()
+    for i, name in enumerate(fields):
+        step = Q(**{f'{name}__lt': values[i]}, **dict(zip(fields[:i], values[:i])))
+        condition |= step
+    return condition
+
+
+def keyset_page(queryset, cursor=None, per_page=12, fields=('created_at', 'id')):
+    fields = tuple(fields)
+    queryset = queryset.order_by(*(f'-{name}' for name in fields))
+    if cursor:
+        queryset = queryset.filter(_after(fields, decode_cursor(cursor, queryset.model, fields)))
+
+    # One extra row tells whether another page follows, without a COUNT.
+    rows = list(queryset[:per_page + 1])
+    object_list = rows[:per_page]
+    next_cursor = encode_cursor(object_list[-1], fields) if len(rows) > per_page else None
+    return KeysetPage(object_list, next_cursor, cursor)
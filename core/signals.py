@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from instructor.models import Course
+from .page_cache import purge_course, purge_instructor
+
+
+# Catalogue cache invalidation (core.page_cache). Pending courses and
+# instructors awaiting approval are never listed, so saving them purges
+# nothing; a rejected course may just have left the catalogue.
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def purge_course_pages(sender, instance, **kwargs):
+    if instance.approval_status != 'pending':
+        purge_course(instance.id)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def purge_instructor_pages(sender, instance, update_fields=None, **kwargs):
+    if instance.role != 'instructor' or not instance.is_approved:
+        return
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    purge_instructor(instance.id)
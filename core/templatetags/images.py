@@ -0,0 +1,31 @@
+from django import template
+from django.utils.html import format_html
+
+from core.images import image_sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes='100vw', alt='', css_class='', width=None, height=None):
+    # {% responsive_image course.thumbnail sizes="33vw" alt=course.title css_class="card-img-top" %}
+    # renders a <picture> with WebP and JPEG srcsets; images whose variants
+    # have not been generated yet fall back to a plain <img> of the original.
+    sources = image_sources(field_file)
+    if sources is None:
+        return ''
+
+    dimensions = format_html(' width="{}" height="{}"', width, height) if width and height else ''
+    if not sources['srcset']:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="lazy"{}>', sources['src'], alt, css_class, dimensions
+        )
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy" decoding="async"{}>'
+        '</picture>',
+        sources['webp_srcset'], sizes,
+        sources['src'], sources['srcset'], sizes, alt, css_class, dimensions,
+    )
@@ -3,5 +3,6 @@ from . import views
 
 urlpatterns = [
     path('', views.homepage, name='homepage'),
+    path('api/courses/', views.course_feed, name='course_feed'),
+    path('api/instructors/', views.instructor_feed, name='instructor_feed'),
 ]
-
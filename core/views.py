@@ -1,12 +1,50 @@
+from django.http import JsonResponse
 from django.shortcuts import render
-from accounts.models import CustomUser
-from instructor.models import Course
 
+from techademy.replicas import read_replica
+
+from .catalogue import (
+    COURSES_PER_PAGE, INSTRUCTORS_PER_PAGE, course_card, course_page, instructor_card, instructor_page,
+)
+from .page_cache import cache_anonymous_page, cache_timeout
+from .pagination import InvalidCursor
+
+HOMEPAGE_COURSES = 9
+MAX_FEED_PAGE_SIZE = 48
+
+
+@cache_anonymous_page
+@read_replica
 def homepage(request):
-    courses = Course.objects.filter(approval_status='approved', instructor__is_approved=True)
-    instructors = CustomUser.objects.filter(role='instructor', is_approved=True)
+    courses = course_page(per_page=HOMEPAGE_COURSES)
+    instructors = instructor_page()
     return render(request, 'home.html', {
         'courses': courses,
         'instructors': instructors,
+        'card_cache_timeout': cache_timeout(),
+    })
+
+
+def _feed(request, page_for, card, default_size):
+    try:
+        per_page = min(max(int(request.GET.get('limit', default_size)), 1), MAX_FEED_PAGE_SIZE)
+    except ValueError:
+        per_page = default_size
+    try:
+        page = page_for(request.GET.get('cursor') or None, per_page)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+    return JsonResponse({
+        'results': [card(obj) for obj in page],
+        'next_cursor': page.next_cursor,
     })
 
+
+@read_replica
+def course_feed(request):
+    return _feed(request, course_page, course_card, COURSES_PER_PAGE)
+
+
+@read_replica
+def instructor_feed(request):
+    return _feed(request, instructor_page, instructor_card, INSTRUCTORS_PER_PAGE)
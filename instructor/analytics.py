@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from student.models import Enrollment, LessonProgress, QuizAnswer, QuizScore
+from .models import Course, CourseStats, DailyEnrollmentStats, Lesson, LessonStats, Question, QuestionStats
+
+
+# Course analytics rollups.
+#
+# rollup_courses() recomputes the CourseStats, DailyEnrollmentStats,
+# LessonStats and QuestionStats rows of a set of courses with a handful of GROUP BY queries
+# per ROLLUP_BATCH courses, and swaps them in inside one transaction.
+# rollup_changed_courses() only does that for courses whose facts moved
+# since the previous run (new enrollments, watched lessons, quiz scores),
+# found through the timestamp indexes on those tables; a nightly full
+# rollup picks up what timestamps cannot show, such as deleted enrollments.
+# A quiz counts as passed with full marks, as for certificates. Question
+# difficulty comes from the QuizAnswer log and so covers its retention window.
+
+ROLLUP_BATCH = 500
+# How far back the enrollment chart on the analytics page goes.
+ANALYTICS_DAYS = 90
+
+
+def _batches(ids):
+    for start in range(0, len(ids), ROLLUP_BATCH):
+        yield ids[start:start + ROLLUP_BATCH]
+
+
+def last_rollup():
+    return CourseStats.objects.aggregate(last=Max('rolled_up_at'))['last']
+
+
+def changed_course_ids(since):
+    changed = set(Enrollment.objects.filter(enrolled_on__gte=since).values_list('course_id', flat=True).distinct())
+    changed.update(
+        LessonProgress.objects.filter(watched_on__gte=since).values_list('lesson__course_id', flat=True).distinct()
+    )
+    changed.update(
+        QuizScore.objects.filter(updated_at__gte=since).values_list('lesson__course_id', flat=True).distinct()
+    )
+    changed.update(Course.objects.filter(stats__isnull=True).values_list('id', flat=True))
+    return changed
+
+
+def _rollup_batch(course_ids, now):
+    enrollments = Enrollment.objects.filter(course_id__in=course_ids)
+    totals = {
+        row['course_id']: row
+        for row in enrollments.values('course_id').annotate(
+            enrollments=Count('id'),
+            completions=Count('id', filter=Q(
+                course__lesson_count__gt=0, completed_lessons__gte=F('course__lesson_count'),
+            )),
+        )
+    }
+    daily = (
+        enrollments.annotate(day=TruncDate('enrolled_on'))
+        .values('course_id', 'day').annotate(enrollments=Count('id')).order_by()
+    )
+    completed = dict(
+        LessonProgress.objects.filter(lesson__course_id__in=course_ids, is_completed=True)
+        .values('lesson_id').annotate(n=Count('id')).values_list('lesson_id', 'n')
+    )
+    quizzes = {
+        row['lesson_id']: row
+        for row in QuizScore.objects.filter(lesson__course_id__in=course_ids).values('lesson_id').annotate(
+            takers=Count('id'), passes=Count('id', filter=Q(is_perfect=True)),
+            score=Sum('score'), total=Sum('total'),
+        )
+    }
+
+    answers = {
+        row['question_id']: row
+        for row in QuizAnswer.objects.filter(question__lesson__course_id__in=course_ids).values('question_id').annotate(
+            attempts=Count('id'), correct=Count('id', filter=Q(is_correct=True)), latency=Avg('latency_ms'),
+        ).order_by()
+    }
+    question_stats = []
+    for question_id, course_id in Question.objects.filter(lesson__course_id__in=course_ids).values_list(
+        'id', 'lesson__course_id'
+    ):
+        answered = answers.get(question_id, {'attempts': 0, 'correct': 0, 'latency': None})
+        question_stats.append(QuestionStats(
+            question_id=question_id, course_id=course_id, attempts=answered['attempts'],
+            correct=answered['correct'],
+            average_latency_ms=round(answered['latency']) if answered['latency'] is not None else None,
+        ))
+
+    lesson_stats, course_quiz = [], {}
+    for lesson_id, course_id in Lesson.objects.filter(course_id__in=course_ids).values_list('id', 'course_id'):
+        quiz = quizzes.get(lesson_id, {'takers': 0, 'passes': 0, 'score': 0, 'total': 0})
+        lesson_stats.append(LessonStats(
+            lesson_id=lesson_id, course_id=course_id, completed=completed.get(lesson_id, 0),
+            quiz_takers=quiz['takers'], quiz_passes=quiz['passes'],
+            average_score=round(100 * quiz['score'] / quiz['total']) if quiz['total'] else None,
+        ))
+        takers, passes = course_quiz.get(course_id, (0, 0))
+        course_quiz[course_id] = (takers + quiz['takers'], passes + quiz['passes'])
+
+    course_stats = []
+    for course_id in course_ids:
+        total = totals.get(course_id, {'enrollments': 0, 'completions': 0})
+        takers, passes = course_quiz.get(course_id, (0, 0))
+        course_stats.append(CourseStats(
+            course_id=course_id, enrollments=total['enrollments'], completions=total['completions'],
+            quiz_takers=takers, quiz_passes=passes, rolled_up_at=now,
+        ))
+
+    with transaction.atomic():
+        for model in (CourseStats, DailyEnrollmentStats, LessonStats, QuestionStats):
+            model.objects.filter(course_id__in=course_ids).delete()
+        CourseStats.objects.bulk_create(course_stats)
+        DailyEnrollmentStats.objects.bulk_create(DailyEnrollmentStats(**row) for row in daily)
+        LessonStats.objects.bulk_create(lesson_stats)
+        QuestionStats.objects.bulk_create(question_stats)
+
+
+def rollup_courses(course_ids=None):
+    # Returns the number of courses rolled up.
+    now = timezone.now()
+    if course_ids is None:
+        course_ids = Course.objects.values_list('id', flat=True)
+    rolled_up = 0
+    for batch in _batches(sorted(course_ids)):
+        # Skip ids of courses deleted in the meantime.
+        batch = list(Course.objects.filter(id__in=batch).values_list('id', flat=True))
+        if batch:
+            _rollup_batch(batch, now)
+            rolled_up += len(batch)
+    return rolled_up
+
+
+def rollup_changed_courses():
+    since = last_rollup()
+    if since is None:
+        return rollup_courses()
+    return rollup_courses(changed_course_ids(since))
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class InstructorConfig(AppConfig):
     name = 'instructor'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.catalogue import catalogue_courses
+from instructor.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Drop and rebuild the full-text course search index from the courses the catalogue lists.'
+
+    def handle(self, *args, **options):
+        courses = catalogue_courses()
+        rebuild_index(courses)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {courses.count()} listed course(s)."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from instructor.analytics import rollup_changed_courses, rollup_courses
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh the course analytics rollups for courses with activity since the last run. '
+        'Run it every few minutes, and with --full nightly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Roll up every course.')
+
+    def handle(self, *args, **options):
+        count = rollup_courses() if options['full'] else rollup_changed_courses()
+        self.stdout.write(self.style.SUCCESS(f"Rolled up analytics for {count} course(s)."))
@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from instructor.transcoding import get_transcoder, requeue_stale_transcodes, run_pending_transcodes
+
+
+class Command(BaseCommand):
+    help = 'Transcode lesson videos queued for HLS into adaptive renditions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--batch', type=int, default=1, help='Jobs to run per pass.')
+        parser.add_argument('--stale-minutes', type=int, default=120,
+                            help='Requeue jobs stuck in processing for longer than this.')
+
+    def handle(self, *args, **options):
+        if get_transcoder() is None:
+            raise CommandError('No transcoder available: set VIDEO_TRANSCODER and make sure ffmpeg is installed.')
+
+        stale_after = timedelta(minutes=options['stale_minutes'])
+        while True:
+            requeued = requeue_stale_transcodes(stale_after)
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale transcode job(s).")
+
+            transcoded = run_pending_transcodes(options['batch'])
+            if transcoded:
+                self.stdout.write(f"Transcoded {transcoded} lesson video(s).")
+
+            if options['once']:
+                break
+            if not transcoded:
+                time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0005_auto_20250707_1848'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
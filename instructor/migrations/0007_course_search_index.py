@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from instructor.search import get_backend
+
+    Course = apps.get_model('instructor', 'Course')
+    backend = get_backend(schema_editor.connection)
+    with schema_editor.connection.cursor() as cursor:
+        backend.create_index(cursor)
+        for course in Course.objects.filter(approval_status='approved').iterator():
+            backend.index(cursor, course)
+
+
+def drop_search_index(apps, schema_editor):
+    from instructor.search import get_backend
+
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection).drop_index(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0006_course_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0008_videoupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='hls_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='hls_manifest',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='hls_status',
+            field=models.CharField(choices=[('none', 'Not transcoded'), ('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='hls_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
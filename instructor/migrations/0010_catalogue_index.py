@@ -0,0 +1,17 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0009_lesson_hls'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['approval_status', 'created_at', 'id'], name='course_catalogue_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0010_catalogue_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['instructor', 'approval_status'], name='course_instructor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(approval_status='pending'), fields=['created_at'], name='course_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(condition=models.Q(hls_status__in=['pending', 'processing']), fields=['hls_status', 'hls_updated_at'], name='lesson_transcode_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0013_question_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='videoupload',
+            name='status',
+            field=models.CharField(choices=[('uploading', 'Uploading'), ('writing', 'Writing'), ('complete', 'Complete'), ('aborted', 'Aborted')], default='uploading', max_length=10),
+        ),
+    ]
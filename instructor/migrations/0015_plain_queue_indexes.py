@@ -0,0 +1,25 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0014_videoupload_writing_status'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='course',
+            name='course_pending_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='lesson',
+            name='lesson_transcode_queue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['hls_status', 'hls_updated_at'], name='lesson_transcode_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0015_plain_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='thumbnail_variants',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from accounts.models import CustomUser
 
@@ -14,17 +16,48 @@ class Course(models.Model):
     category = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=8, decimal_places=2, default=0.00)
     thumbnail = models.ImageField(upload_to='course_thumbnails/')
+    # Name of the thumbnail whose resized variants exist (core.images).
+    thumbnail_variants = models.CharField(max_length=100, blank=True, editable=False)
     approval_status = models.CharField(max_length=10, choices=APPROVAL_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    lesson_count = models.PositiveIntegerField(default=0)
+    question_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the public catalogue (core.catalogue), and
+            # the admin moderation queues by status.
+            models.Index(fields=['approval_status', 'created_at', 'id'], name='course_catalogue_idx'),
+            # An instructor's courses by status (dashboard, course overview).
+            models.Index(fields=['instructor', 'approval_status'], name='course_instructor_status_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 class Lesson(models.Model):
+    HLS_STATUS_CHOICES = (
+        ('none', 'Not transcoded'),
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    )
+
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='lessons')
     title = models.CharField(max_length=255)
     youtube_link = models.URLField(blank=True, null=True)
     video_file = models.FileField(upload_to='lesson_videos/', blank=True, null=True)
+    hls_status = models.CharField(max_length=10, choices=HLS_STATUS_CHOICES, default='none')
+    hls_manifest = models.CharField(max_length=255, blank=True)
+    hls_error = models.TextField(blank=True)
+    hls_updated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Transcode jobs waiting for or held by run_transcode_worker.
+            models.Index(fields=['hls_status', 'hls_updated_at'], name='lesson_transcode_queue_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -44,3 +77,82 @@ class Choice(models.Model):
 
     def __str__(self):
         return self.text
+
+
+class VideoUpload(models.Model):
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('writing', 'Writing'),
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='video_uploads')
+    uploaded_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+
+# Analytics rollups, rebuilt from Enrollment, LessonProgress and QuizScore by
+# `manage.py rollup_course_analytics` (instructor.analytics). Dashboards read
+# only these tables.
+
+class CourseStats(models.Model):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, related_name='stats')
+    enrollments = models.PositiveIntegerField(default=0)
+    completions = models.PositiveIntegerField(default=0)
+    quiz_takers = models.PositiveIntegerField(default=0)
+    quiz_passes = models.PositiveIntegerField(default=0)
+    rolled_up_at = models.DateTimeField()
+
+    @property
+    def pass_rate(self):
+        return round(100 * self.quiz_passes / self.quiz_takers) if self.quiz_takers else None
+
+    @property
+    def completion_rate(self):
+        return round(100 * self.completions / self.enrollments) if self.enrollments else None
+
+
+class DailyEnrollmentStats(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='daily_enrollment_stats')
+    day = models.DateField()
+    enrollments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('course', 'day')
+
+
+class LessonStats(models.Model):
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, related_name='stats')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='lesson_stats')
+    completed = models.PositiveIntegerField(default=0)
+    quiz_takers = models.PositiveIntegerField(default=0)
+    quiz_passes = models.PositiveIntegerField(default=0)
+    # Sum of scores over sum of totals, in percent.
+    average_score = models.PositiveSmallIntegerField(null=True)
+
+    @property
+    def pass_rate(self):
+        return round(100 * self.quiz_passes / self.quiz_takers) if self.quiz_takers else None
+
+
+class QuestionStats(models.Model):
+    # Item statistics from the retained student.QuizAnswer log.
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='stats')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='question_stats')
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    average_latency_ms = models.PositiveIntegerField(null=True)
+
+    @property
+    def percent_correct(self):
+        return round(100 * self.correct / self.attempts) if self.attempts else None
@@ -0,0 +1,55 @@
+from uuid import uuid4
+
+from django.core.cache import caches
+
+from .models import Question
+
+
+# Versioned cache of each lesson's quiz (questions with their choices).
+#
+# Entries are keyed by a per-lesson version stamp. Editing a quiz only
+# replaces the stamp, so readers move to a fresh key at once and stale
+# entries simply age out of the store. Stamps expire like the entries; a
+# missing stamp is replaced, which is a miss. Lesson ids are reused when a
+# database is recreated, so migrate (and flush) clear the whole store.
+
+QUIZ_CACHE_ALIAS = 'quiz'
+QUIZ_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _cache():
+    return caches[QUIZ_CACHE_ALIAS]
+
+
+def _version_key(lesson_id):
+    return f'quiz:{lesson_id}:version'
+
+
+def quiz_version(lesson_id):
+    cache = _cache()
+    version = cache.get(_version_key(lesson_id))
+    if version is None:
+        cache.add(_version_key(lesson_id), uuid4().hex, QUIZ_CACHE_TIMEOUT)
+        version = cache.get(_version_key(lesson_id))
+    return version
+
+
+def bump_quiz_version(lesson_id):
+    # Call after the quiz change has been committed.
+    _cache().set(_version_key(lesson_id), uuid4().hex, QUIZ_CACHE_TIMEOUT)
+
+
+def clear_quiz_cache():
+    _cache().clear()
+
+
+def get_quiz_questions(lesson_id):
+    cache = _cache()
+    key = f'quiz:{lesson_id}:{quiz_version(lesson_id)}'
+    questions = cache.get(key)
+    if questions is None:
+        questions = list(
+            Question.objects.filter(lesson_id=lesson_id).order_by('id').prefetch_related('choices')
+        )
+        cache.set(key, questions, QUIZ_CACHE_TIMEOUT)
+    return questions
@@ -0,0 +1,238 @@
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+
+from core.catalogue import catalogue_courses, is_listed
+from .models import Course
+
+
+# Ranked full-text search over the catalogue's courses.
+#
+# Only courses the catalogue lists (core.catalogue) live in the index, so a
+# search never has to join back to the course table to filter them. The
+# index is kept current by the Course save/delete signals in
+# instructor.signals. Searches read through the database router, so they
+# follow @read_replica like the rest of the view; index writes go to the
+# primary.
+
+SQLITE_TABLE = 'instructor_course_fts'
+POSTGRES_TABLE = 'instructor_course_search'
+
+# Relative importance of a hit in the title, description and category.
+TITLE_WEIGHT, DESCRIPTION_WEIGHT, CATEGORY_WEIGHT = 10.0, 1.0, 5.0
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+class SQLiteFTSBackend:
+    def create_index(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} "
+            "USING fts5(title, description, category, tokenize='porter unicode61')"
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+
+    def index(self, cursor, course):
+        cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [course.id])
+        cursor.execute(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, title, description, category) VALUES (%s, %s, %s, %s)",
+            [course.id, course.title, course.description, course.category]
+        )
+
+    def remove(self, cursor, course_id):
+        cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [course_id])
+
+    def _match(self, terms):
+        # Every term must match, each as a prefix so half-typed words still hit.
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def count(self, cursor, terms):
+        cursor.execute(f"SELECT COUNT(*) FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s", [self._match(terms)])
+        return cursor.fetchone()[0]
+
+    def ranked_ids(self, cursor, terms, limit, offset):
+        cursor.execute(
+            f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s "
+            f"ORDER BY bm25({SQLITE_TABLE}, %s, %s, %s), rowid LIMIT %s OFFSET %s",
+            [self._match(terms), TITLE_WEIGHT, DESCRIPTION_WEIGHT, CATEGORY_WEIGHT, limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresBackend:
+    document = (
+        "setweight(to_tsvector('english', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'B') || "
+        "setweight(to_tsvector('english', %s), 'C')"
+    )
+
+    def create_index(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+            "course_id integer PRIMARY KEY REFERENCES instructor_course (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_gin ON {POSTGRES_TABLE} USING GIN (document)"
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+    def index(self, cursor, course):
+        cursor.execute(
+            f"INSERT INTO {POSTGRES_TABLE} (course_id, document) VALUES (%s, {self.document}) "
+            "ON CONFLICT (course_id) DO UPDATE SET document = EXCLUDED.document",
+            [course.id, course.title, course.category, course.description]
+        )
+
+    def remove(self, cursor, course_id):
+        cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE course_id = %s", [course_id])
+
+    def _tsquery(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def count(self, cursor, terms):
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {POSTGRES_TABLE} WHERE document @@ to_tsquery('english', %s)",
+            [self._tsquery(terms)]
+        )
+        return cursor.fetchone()[0]
+
+    def ranked_ids(self, cursor, terms, limit, offset):
+        cursor.execute(
+            f"SELECT course_id FROM {POSTGRES_TABLE}, to_tsquery('english', %s) query "
+            "WHERE document @@ query ORDER BY ts_rank(document, query) DESC, course_id "
+            "LIMIT %s OFFSET %s",
+            [self._tsquery(terms), limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class LikeBackend:
+    # Last resort for databases without a usable full-text engine.
+    def create_index(self, cursor):
+        pass
+
+    def drop_index(self, cursor):
+        pass
+
+    def index(self, cursor, course):
+        pass
+
+    def remove(self, cursor, course_id):
+        pass
+
+    def _queryset(self, terms):
+        courses = catalogue_courses()
+        for term in terms:
+            courses = courses.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(category__icontains=term)
+            )
+        return courses
+
+    def count(self, cursor, terms):
+        return self._queryset(terms).count()
+
+    def ranked_ids(self, cursor, terms, limit, offset):
+        return list(self._queryset(terms).order_by('-created_at', '-id').values_list('id', flat=True)[offset:offset + limit])
+
+
+_fts5_support = {}
+
+
+def _sqlite_has_fts5(conn):
+    if conn.alias not in _fts5_support:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            _fts5_support[conn.alias] = bool(cursor.fetchone()[0])
+    return _fts5_support[conn.alias]
+
+
+def get_backend(conn):
+    if conn.vendor == 'postgresql':
+        return PostgresBackend()
+    if conn.vendor == 'sqlite' and _sqlite_has_fts5(conn):
+        return SQLiteFTSBackend()
+    return LikeBackend()
+
+
+def _read_connection():
+    return connections[router.db_for_read(Course)]
+
+
+def _write_connection():
+    return connections[router.db_for_write(Course)]
+
+
+def index_course(course):
+    conn = _write_connection()
+    backend = get_backend(conn)
+    with conn.cursor() as cursor:
+        if is_listed(course):
+            backend.index(cursor, course)
+        else:
+            backend.remove(cursor, course.id)
+
+
+def remove_course(course_id):
+    conn = _write_connection()
+    with conn.cursor() as cursor:
+        get_backend(conn).remove(cursor, course_id)
+
+
+def rebuild_index(courses=None):
+    conn = _write_connection()
+    backend = get_backend(conn)
+    if courses is None:
+        courses = catalogue_courses()
+    with conn.cursor() as cursor:
+        backend.drop_index(cursor)
+        backend.create_index(cursor)
+        for course in courses.using(conn.alias).iterator():
+            backend.index(cursor, course)
+
+
+class CourseSearchResults:
+    # Lazily evaluated, ranked result set that django.core.paginator.Paginator
+    # can slice: only the ids on the requested page are fetched and hydrated.
+
+    def __init__(self, query):
+        self.query = query
+        self.terms = _terms(query)
+        self.connection = _read_connection()
+        self.backend = get_backend(self.connection)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if not self.terms:
+                self._count = 0
+            else:
+                with self.connection.cursor() as cursor:
+                    self._count = self.backend.count(cursor, self.terms)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        offset = item.start or 0
+        limit = (item.stop if item.stop is not None else self.count()) - offset
+        if not self.terms or limit <= 0:
+            return []
+        with self.connection.cursor() as cursor:
+            ids = self.backend.ranked_ids(cursor, self.terms, limit, offset)
+        courses = Course.objects.using(self.connection.alias).in_bulk(ids)
+        return [courses[course_id] for course_id in ids if course_id in courses]
+
+
+def search_courses(query):
+    return CourseSearchResults(query)
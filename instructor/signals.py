@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .models import Course
+from .quiz_cache import clear_quiz_cache
+from .search import index_course, remove_course
+
+
+@receiver(post_save, sender=Course)
+def update_course_search_index(sender, instance, **kwargs):
+    index_course(instance)
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_from_search_index(sender, instance, **kwargs):
+    remove_course(instance.id)
+
+
+@receiver(post_migrate)
+def reset_quiz_cache(sender, app_config, **kwargs):
+    # A new or flushed database reuses lesson ids the cache may still hold.
+    if app_config.name == 'instructor':
+        clear_quiz_cache()
@@ -0,0 +1,347 @@
+import hashlib
+import json
+import uuid
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .analytics import rollup_changed_courses, rollup_courses
+from .models import (
+    Choice, Course, CourseStats, DailyEnrollmentStats, Lesson, LessonStats, Question, QuestionStats, VideoUpload,
+)
+from .search import search_courses
+from .transcoding import StubTranscoder, queue_transcode, run_pending_transcodes
+from student.counters import record_quiz_score
+from student.models import Enrollment, LessonProgress, QuizAnswer, QuizScore
+
+
+class CourseSearchTests(TestCase):
+    def setUp(self):
+        self.instructor = CustomUser.objects.create_user(
+            username='teacher@example.com', email='teacher@example.com',
+            password='pass', role='instructor', is_approved=True,
+        )
+
+    def make_course(self, title, description='', category='general', approval_status='approved'):
+        return Course.objects.create(
+            instructor=self.instructor, title=title, description=description, category=category,
+            thumbnail='course_thumbnails/x.png', approval_status=approval_status,
+        )
+
+    def titles(self, query):
+        return [course.title for course in search_courses(query)[:20]]
+
+    def test_prefix_match_and_ranking(self):
+        self.make_course('Cooking basics', description='Recipes for python lovers')
+        self.make_course('Python programming', description='Learn to code')
+
+        self.assertEqual(self.titles('pyth'), ['Python programming', 'Cooking basics'])
+        self.assertEqual(self.titles('python prog'), ['Python programming'])
+        self.assertEqual(self.titles('rust'), [])
+
+    def test_index_follows_approval(self):
+        course = self.make_course('Django in depth', approval_status='pending')
+        self.assertEqual(self.titles('django'), [])
+
+        course.approval_status = 'approved'
+        course.save()
+        self.assertEqual(self.titles('django'), ['Django in depth'])
+
+        course.title = 'Flask in depth'
+        course.save()
+        self.assertEqual(self.titles('django'), [])
+        self.assertEqual(self.titles('flask'), ['Flask in depth'])
+
+        course.delete()
+        self.assertEqual(self.titles('flask'), [])
+
+    def test_results_paginate(self):
+        for i in range(5):
+            self.make_course(f'Data science {i}')
+
+        page = Paginator(search_courses('data'), 2).get_page(3)
+        self.assertEqual(page.paginator.count, 5)
+        self.assertEqual(len(page.object_list), 1)
+
+    def test_searches_read_through_the_router(self):
+        self.make_course('Go concurrency')
+        with mock.patch('instructor.search.router.db_for_read', return_value='default') as db_for_read:
+            self.assertEqual(self.titles('concurrency'), ['Go concurrency'])
+        db_for_read.assert_called_with(Course)
+
+
+class ChunkedVideoUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root, VIDEO_UPLOAD_TEMP_DIR=f'{self.media_root}/parts'
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.instructor = CustomUser.objects.create_user(
+            username='teacher@example.com', email='teacher@example.com',
+            password='pass', role='instructor', is_approved=True,
+        )
+        course = Course.objects.create(
+            instructor=self.instructor, title='Video', description='', category='dev',
+            thumbnail='course_thumbnails/x.png', approval_status='approved',
+        )
+        self.lesson = Lesson.objects.create(course=course, title='Intro')
+        self.client.force_login(self.instructor)
+
+    def put_chunk(self, upload_id, offset, data, checksum=None):
+        return self.client.put(
+            f'/instructor/video-upload/{upload_id}/', data, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+            HTTP_X_CHUNK_SHA256=checksum or hashlib.sha256(data).hexdigest(),
+        )
+
+    def test_resumable_upload(self):
+        video = b'0123456789' * 100
+        response = self.client.post(
+            f'/instructor/lesson/{self.lesson.id}/video-upload/', {'filename': 'intro.mp4', 'size': len(video)}
+        )
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.json()['upload_id']
+
+        self.assertEqual(self.put_chunk(upload_id, 0, video[:400]).json()['offset'], 400)
+        bad = self.put_chunk(upload_id, 400, video[400:800], checksum='0' * 64)
+        self.assertEqual((bad.status_code, bad.json()['offset']), (400, 400))
+        stale = self.put_chunk(upload_id, 0, video[:400])
+        self.assertEqual((stale.status_code, stale.json()['offset']), (409, 400))
+
+        self.assertEqual(self.client.get(f'/instructor/video-upload/{upload_id}/').json()['offset'], 400)
+        self.put_chunk(upload_id, 400, video[400:])
+
+        response = self.client.post(
+            f'/instructor/video-upload/{upload_id}/complete/', {'sha256': hashlib.sha256(video).hexdigest()}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.lesson.refresh_from_db()
+        with self.lesson.video_file.open('rb') as fh:
+            self.assertEqual(fh.read(), video)
+        self.assertEqual(VideoUpload.objects.get().status, 'complete')
+
+    def test_concurrent_chunk_is_rejected(self):
+        video = b'0123456789' * 10
+        upload_id = self.client.post(
+            f'/instructor/lesson/{self.lesson.id}/video-upload/', {'filename': 'intro.mp4', 'size': len(video)}
+        ).json()['upload_id']
+
+        # Another request is still writing the chunk at offset 0.
+        VideoUpload.objects.filter(id=upload_id).update(status='writing', updated_at=timezone.now())
+        busy = self.put_chunk(upload_id, 0, video)
+        self.assertEqual((busy.status_code, busy.json()['offset']), (409, 0))
+
+        # A claim left by a request that died is taken over once it expires.
+        VideoUpload.objects.filter(id=upload_id).update(updated_at=timezone.now() - timedelta(hours=1))
+        resumed = self.put_chunk(upload_id, 0, video)
+        self.assertEqual((resumed.status_code, resumed.json()['offset'], resumed.json()['status']),
+                         (200, 100, 'uploading'))
+
+
+@override_settings(VIDEO_TRANSCODER='stub')
+class TranscodingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(MEDIA_ROOT=self.media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        instructor = CustomUser.objects.create_user(
+            username='teacher@example.com', email='teacher@example.com',
+            password='pass', role='instructor', is_approved=True,
+        )
+        student = CustomUser.objects.create_user(
+            username='learner@example.com', email='learner@example.com', password='pass', role='student',
+        )
+        course = Course.objects.create(
+            instructor=instructor, title='Video', description='', category='dev',
+            thumbnail='course_thumbnails/x.png', approval_status='approved',
+        )
+        Enrollment.objects.create(student=student, course=course)
+        self.lesson = Lesson.objects.create(course=course, title='Intro')
+        self.lesson.video_file.save('intro.mp4', ContentFile(b'raw video' * 100))
+        self.client.force_login(student)
+
+    def hls(self, name):
+        return self.client.get(f'/student/lesson/{self.lesson.id}/hls/{name}')
+
+    def test_transcode_and_serve(self):
+        self.assertTrue(queue_transcode(self.lesson))
+        self.assertEqual(self.hls('master.m3u8').status_code, 404)
+
+        self.assertEqual(run_pending_transcodes(), 1)
+        self.lesson.refresh_from_db()
+        self.assertEqual(self.lesson.hls_status, 'ready')
+
+        master = self.hls('master.m3u8')
+        self.assertEqual(master['Content-Type'], 'application/vnd.apple.mpegurl')
+        playlist = b''.join(master.streaming_content).decode()
+        self.assertIn('360p/index.m3u8', playlist)
+        self.assertIn('BANDWIDTH=', playlist)
+        self.assertEqual(self.hls('360p/segment_0000.ts')['Content-Type'], 'video/mp2t')
+        self.assertEqual(self.hls('../../../lesson_videos/intro.mp4').status_code, 404)
+
+        response = self.client.get(f'/student/lesson/{self.lesson.id}/view/')
+        self.assertContains(response, 'data-hls=')
+
+    def test_video_replaced_during_transcode(self):
+        queue_transcode(self.lesson)
+        transcode = StubTranscoder.transcode
+
+        def replace_video(transcoder, source, out_dir):
+            # The instructor uploads another video while the worker runs.
+            Lesson.objects.filter(id=self.lesson.id).update(video_file='lesson_videos/other.mp4')
+            queue_transcode(Lesson.objects.get(id=self.lesson.id))
+            return transcode(transcoder, source, out_dir)
+
+        with mock.patch.object(StubTranscoder, 'transcode', replace_video):
+            self.assertEqual(run_pending_transcodes(), 0)
+        self.lesson.refresh_from_db()
+        self.assertEqual((self.lesson.hls_status, self.lesson.hls_manifest), ('pending', ''))
+
+
+class EnrollmentReportTests(TestCase):
+    def setUp(self):
+        self.instructor = CustomUser.objects.create_user(
+            username='teacher@example.com', email='teacher@example.com',
+            password='pass', role='instructor', is_approved=True,
+        )
+        self.courses = [
+            Course.objects.create(
+                instructor=self.instructor, title=f'Course {i}', description='', category='dev',
+                thumbnail='course_thumbnails/x.png', approval_status='approved',
+            )
+            for i in range(3)
+        ]
+        CustomUser.objects.bulk_create([
+            CustomUser(
+                username=f's{i}@example.com', email=f's{i}@example.com', role='student',
+                first_name='Student', last_name=str(i),
+            )
+            for i in range(60)
+        ])
+        for i, student in enumerate(CustomUser.objects.filter(role='student').order_by('id')):
+            Enrollment.objects.create(student=student, course=self.courses[i % 3] if i >= 55 else self.courses[0])
+        self.client.force_login(self.instructor)
+
+    def test_report_query_count_does_not_grow_with_courses(self):
+        with self.assertNumQueries(4):  # session, user, courses with counts, roster page
+            response = self.client.get('/instructor/enrollments/', {'course': self.courses[0].id, 'page': 2})
+        self.assertEqual([c.enrolled for c in response.context['courses']], [2, 2, 56])
+        page = response.context['page']
+        self.assertEqual(page.paginator.num_pages, 2)
+        self.assertEqual(len(page.object_list), 6)
+        self.assertEqual(page.object_list[0]['name'], 'Student 50')
+
+    def test_csv_and_ndjson_exports_stream(self):
+        response = self.client.get('/instructor/enrollments/export/', {'course': self.courses[1].id})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'course,name,email,phone,enrolled_on,completed_lessons')
+        self.assertEqual(len(lines), 3)
+
+        response = self.client.get('/instructor/enrollments/export/', {'format': 'ndjson'})
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), 60)
+        self.assertEqual(records[0]['email'], 's0@example.com')
+
+    def test_export_is_limited_to_own_courses(self):
+        other = CustomUser.objects.create_user(
+            username='other@example.com', email='other@example.com', password='pass',
+            role='instructor', is_approved=True,
+        )
+        self.client.force_login(other)
+        response = self.client.get('/instructor/enrollments/export/', {'course': self.courses[0].id})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get('/instructor/enrollments/export/', {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/instructor/enrollments/export/', {'course': 'abc'}).status_code, 400)
+
+
+class CourseAnalyticsTests(TestCase):
+    def setUp(self):
+        self.instructor = CustomUser.objects.create_user(
+            username='teacher@example.com', email='teacher@example.com',
+            password='pass', role='instructor', is_approved=True,
+        )
+        self.course, self.other = [
+            Course.objects.create(
+                instructor=self.instructor, title=title, description='', category='dev',
+                thumbnail='course_thumbnails/x.png', approval_status='approved', lesson_count=2,
+            )
+            for title in ('Python', 'Rust')
+        ]
+        self.lessons = [Lesson.objects.create(course=self.course, title=f'Lesson {i}') for i in range(2)]
+        self.students = [
+            CustomUser.objects.create_user(
+                username=f's{i}@example.com', email=f's{i}@example.com', password='pass', role='student',
+            )
+            for i in range(3)
+        ]
+        for student in self.students:
+            Enrollment.objects.create(student=student, course=self.course)
+        Enrollment.objects.filter(student=self.students[0]).update(completed_lessons=2)
+        for student in self.students[:2]:
+            LessonProgress.objects.create(student=student, lesson=self.lessons[0], is_completed=True)
+        QuizScore.objects.create(student=self.students[0], lesson=self.lessons[0], score=4, total=4, is_perfect=True)
+        QuizScore.objects.create(student=self.students[1], lesson=self.lessons[0], score=2, total=4)
+        self.question = Question.objects.create(lesson=self.lessons[0], text='2 + 2?')
+        right = Choice.objects.create(question=self.question, text='4', is_correct=True)
+        wrong = Choice.objects.create(question=self.question, text='5')
+        for student, choice, latency in ((self.students[0], right, 1000), (self.students[1], wrong, 3000)):
+            QuizAnswer.objects.create(
+                attempt=uuid.uuid4(), student=student, lesson=self.lessons[0], question=self.question,
+                selected_choice=choice, is_correct=choice.is_correct, latency_ms=latency, answered_at=timezone.now(),
+            )
+
+    def test_rollup(self):
+        self.assertEqual(rollup_courses(), 2)
+
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual((stats.enrollments, stats.completions, stats.quiz_takers, stats.quiz_passes), (3, 1, 2, 1))
+        self.assertEqual(stats.pass_rate, 50)
+        self.assertEqual(
+            list(DailyEnrollmentStats.objects.filter(course=self.course).values_list('enrollments', flat=True)), [3]
+        )
+        first, second = LessonStats.objects.filter(course=self.course).order_by('lesson_id')
+        self.assertEqual((first.completed, first.quiz_takers, first.average_score), (2, 2, 75))
+        self.assertEqual((second.completed, second.quiz_takers, second.average_score), (0, 0, None))
+        self.assertEqual(CourseStats.objects.get(course=self.other).enrollments, 0)
+        question = QuestionStats.objects.get(question=self.question)
+        self.assertEqual((question.attempts, question.percent_correct, question.average_latency_ms), (2, 50, 2000))
+
+    def test_incremental_rollup_only_touches_changed_courses(self):
+        rollup_courses()
+        CourseStats.objects.filter(course=self.other).update(enrollments=99)
+
+        record_quiz_score(self.students[1], self.lessons[0], 4, 4)
+        self.assertEqual(rollup_changed_courses(), 1)
+        self.assertEqual(CourseStats.objects.get(course=self.course).quiz_passes, 2)
+        self.assertEqual(CourseStats.objects.get(course=self.other).enrollments, 99)
+        self.assertEqual(rollup_changed_courses(), 0)
+
+    def test_dashboards_read_only_rollups(self):
+        call_command('rollup_course_analytics', '--full', stdout=StringIO())
+        self.client.force_login(self.instructor)
+        for url in ('/instructor/dashboard/', f'/instructor/course/{self.course.id}/analytics/'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse([q for q in ctx.captured_queries if 'student_' in q['sql']])
+        self.assertEqual(response.context['stats'].enrollments, 3)
+        self.assertContains(response, '2 + 2?')
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import shutil
+import subprocess
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import Lesson
+
+logger = logging.getLogger(__name__)
+
+
+# Background transcoding of Lesson.video_file into adaptive HLS.
+#
+# The lesson row is the job, as with certificates: queue_transcode() marks
+# it pending and the run_transcode_worker command claims it with a
+# conditional pending -> processing UPDATE. Renditions are written to a
+# fresh directory under MEDIA_ROOT/lesson_hls/<lesson id>/, and the lesson
+# only switches to it if its video was not replaced in the meantime.
+# settings.VIDEO_TRANSCODER picks the backend: 'ffmpeg' (when the binary is
+# installed), 'stub' (for tests) or '' to disable transcoding.
+
+HLS_ROOT = 'lesson_hls'
+MASTER_PLAYLIST = 'master.m3u8'
+
+# (name, height, video kbps, audio kbps), lowest first.
+RENDITIONS = (
+    ('360p', 360, 800, 96),
+    ('720p', 720, 2800, 128),
+    ('1080p', 1080, 5000, 160),
+)
+
+
+class TranscodeError(Exception):
+    pass
+
+
+class FFmpegTranscoder:
+    def __init__(self, binary='ffmpeg', segment_seconds=6):
+        self.binary = binary
+        self.segment_seconds = segment_seconds
+
+    def source_height(self, source):
+        probe = shutil.which('ffprobe')
+        if not probe:
+            return None
+        try:
+            output = subprocess.run(
+                [probe, '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=height',
+                 '-of', 'json', source],
+                check=True, capture_output=True, timeout=60,
+            ).stdout
+            return int(json.loads(output)['streams'][0]['height'])
+        except (subprocess.SubprocessError, ValueError, KeyError, IndexError):
+            return None
+
+    def renditions(self, source):
+        # Never upscale: drop renditions taller than the source, keeping the lowest.
+        height = self.source_height(source)
+        if height is None:
+            return RENDITIONS
+        return tuple(r for r in RENDITIONS if r[1] <= height) or RENDITIONS[:1]
+
+    def transcode(self, source, out_dir):
+        renditions = self.renditions(source)
+        for name, height, video_kbps, audio_kbps in renditions:
+            target = os.path.join(out_dir, name)
+            os.makedirs(target, exist_ok=True)
+            command = [
+                self.binary, '-y', '-v', 'error', '-i', source,
+                '-vf', f'scale=-2:{height}',
+                '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main',
+                '-b:v', f'{video_kbps}k', '-maxrate', f'{int(video_kbps * 1.07)}k',
+                '-bufsize', f'{video_kbps * 2}k',
+                # Keyframes on segment boundaries so renditions can switch cleanly.
+                '-force_key_frames', f'expr:gte(t,n_forced*{self.segment_seconds})',
+                '-c:a', 'aac', '-b:a', f'{audio_kbps}k', '-ac', '2',
+                '-f', 'hls', '-hls_time', str(self.segment_seconds), '-hls_playlist_type', 'vod',
+                '-hls_segment_filename', os.path.join(target, 'segment_%04d.ts'),
+                os.path.join(target, 'index.m3u8'),
+            ]
+            result = subprocess.run(command, capture_output=True)
+            if result.returncode != 0:
+                raise TranscodeError(result.stderr.decode(errors='replace')[-2000:] or f'ffmpeg exited {result.returncode}')
+        return renditions
+
+
+class StubTranscoder:
+    # Writes one tiny segment per rendition without decoding anything.
+
+    def transcode(self, source, out_dir):
+        with open(source, 'rb') as fh:
+            sample = fh.read(1024)
+        for name, *_ in RENDITIONS:
+            target = os.path.join(out_dir, name)
+            os.makedirs(target, exist_ok=True)
+            with open(os.path.join(target, 'segment_0000.ts'), 'wb') as segment:
+                segment.write(sample)
+            with open(os.path.join(target, 'index.m3u8'), 'w') as playlist:
+                playlist.write(
+                    '#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:6\n#EXT-X-PLAYLIST-TYPE:VOD\n'
+                    '#EXTINF:6.0,\nsegment_0000.ts\n#EXT-X-ENDLIST\n'
+                )
+        return RENDITIONS
+
+
+def get_transcoder():
+    backend = getattr(settings, 'VIDEO_TRANSCODER', '')
+    if backend == 'stub':
+        return StubTranscoder()
+    if backend == 'ffmpeg':
+        binary = shutil.which(getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'))
+        if binary:
+            return FFmpegTranscoder(binary, getattr(settings, 'HLS_SEGMENT_SECONDS', 6))
+    return None
+
+
+def master_playlist(renditions):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for name, height, video_kbps, audio_kbps in renditions:
+        width = (height * 16 // 9) // 2 * 2
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={(video_kbps + audio_kbps) * 1000},RESOLUTION={width}x{height}')
+        lines.append(f'{name}/index.m3u8')
+    return '\n'.join(lines) + '\n'
+
+
+def _remove_output(manifest):
+    if manifest:
+        shutil.rmtree(default_storage.path(os.path.dirname(manifest)), ignore_errors=True)
+
+
+def queue_transcode(lesson):
+    # Call after lesson.video_file changes. Returns True if a job was queued.
+    fields = {'hls_error': '', 'hls_updated_at': timezone.now()}
+    if lesson.video_file and get_transcoder() is not None:
+        fields['hls_status'] = 'pending'
+    else:
+        # The previous renditions no longer match the lesson's video.
+        _remove_output(lesson.hls_manifest)
+        fields.update(hls_status='none', hls_manifest='')
+    Lesson.objects.filter(id=lesson.id).update(**fields)
+    for name, value in fields.items():
+        setattr(lesson, name, value)
+    return lesson.hls_status == 'pending'
+
+
+def claim_transcode(lesson_id):
+    return Lesson.objects.filter(id=lesson_id, hls_status='pending').update(
+        hls_status='processing', hls_updated_at=timezone.now()
+    ) == 1
+
+
+def run_transcode_job(lesson_id):
+    transcoder = get_transcoder()
+    if transcoder is None or not claim_transcode(lesson_id):
+        return False
+
+    lesson = Lesson.objects.get(id=lesson_id)
+    source = lesson.video_file.name
+    out_name = f'{HLS_ROOT}/{lesson.id}/{timezone.now():%Y%m%d%H%M%S%f}'
+    out_dir = default_storage.path(out_name)
+    manifest = f'{out_name}/{MASTER_PLAYLIST}'
+    try:
+        if not source:
+            raise TranscodeError("The lesson has no video file.")
+        os.makedirs(out_dir, exist_ok=True)
+        renditions = transcoder.transcode(lesson.video_file.path, out_dir)
+        with open(os.path.join(out_dir, MASTER_PLAYLIST), 'w') as fh:
+            fh.write(master_playlist(renditions))
+    except Exception as exc:
+        logger.exception("Transcoding lesson %s failed", lesson_id)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        Lesson.objects.filter(id=lesson_id, hls_status='processing', video_file=source).update(
+            hls_status='failed', hls_error=str(exc), hls_updated_at=timezone.now()
+        )
+        return False
+
+    # A video replaced while we worked has been requeued; keep the old output.
+    switched = Lesson.objects.filter(id=lesson_id, hls_status='processing', video_file=source).update(
+        hls_status='ready', hls_manifest=manifest, hls_error='', hls_updated_at=timezone.now()
+    )
+    if not switched:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        return False
+    if lesson.hls_manifest != manifest:
+        _remove_output(lesson.hls_manifest)
+    return True
+
+
+def requeue_stale_transcodes(older_than=timedelta(hours=2)):
+    return Lesson.objects.filter(
+        hls_status='processing', hls_updated_at__lt=timezone.now() - older_than
+    ).update(hls_status='pending')
+
+
+def run_pending_transcodes(limit=None):
+    pending = Lesson.objects.filter(hls_status='pending').order_by('hls_updated_at', 'id').values_list('id', flat=True)
+    if limit:
+        pending = pending[:limit]
+    return sum(run_transcode_job(lesson_id) for lesson_id in list(pending))
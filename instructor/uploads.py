@@ -0,0 +1,150 @@
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import VideoUpload
+
+
+# Chunked, resumable uploads for Lesson.video_file.
+#
+# Chunks are written straight from the request stream into a partial file
+# at their declared offset and checked against a per-chunk SHA-256. A writer
+# first moves the upload from 'uploading' to 'writing' at that offset, so a
+# concurrent request for the same offset gets a 409 instead of writing over
+# it; the claim is released with the new offset once the chunk is verified.
+# A client that loses its connection asks for the offset and resumes, and a
+# claim left behind by a dead request expires after WRITE_CLAIM_TIMEOUT.
+# On completion the partial file is streamed into the lesson's storage
+# outside any transaction; only the row updates run in one.
+
+READ_BLOCK_SIZE = 64 * 1024
+WRITE_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def chunk_size():
+    return getattr(settings, 'VIDEO_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+
+
+def part_path(upload):
+    return os.path.join(settings.VIDEO_UPLOAD_TEMP_DIR, f'{upload.id}.part')
+
+
+def start_upload(lesson, user, filename, total_size):
+    if total_size <= 0:
+        raise UploadError("The upload size must be positive.")
+    upload = VideoUpload.objects.create(
+        lesson=lesson, uploaded_by=user, filename=os.path.basename(filename), total_size=total_size
+    )
+    os.makedirs(settings.VIDEO_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def _claim(upload, offset):
+    # Compare-and-set: only one request moves the upload into 'writing' at
+    # this offset. A claim older than WRITE_CLAIM_TIMEOUT is taken over.
+    now = timezone.now()
+    claimed = VideoUpload.objects.filter(id=upload.id, received_bytes=offset).filter(
+        Q(status='uploading') | Q(status='writing', updated_at__lt=now - WRITE_CLAIM_TIMEOUT)
+    ).update(status='writing', updated_at=now)
+    if not claimed:
+        upload.refresh_from_db()
+        raise UploadError("Another request is writing to this upload.", status=409, offset=upload.received_bytes)
+
+
+def _release(upload, offset, received_bytes, status='uploading'):
+    VideoUpload.objects.filter(id=upload.id, status='writing', received_bytes=offset).update(
+        status=status, received_bytes=received_bytes, updated_at=timezone.now()
+    )
+    upload.status = status
+    upload.received_bytes = received_bytes
+
+
+def write_chunk(upload, offset, stream, length, checksum):
+    if upload.status not in ('uploading', 'writing'):
+        raise UploadError("This upload is no longer accepting data.", status=409, offset=upload.received_bytes)
+    if offset != upload.received_bytes:
+        raise UploadError("Chunk does not start at the current offset.", status=409, offset=upload.received_bytes)
+    if length <= 0 or offset + length > upload.total_size:
+        raise UploadError("Chunk exceeds the declared upload size.", status=413, offset=upload.received_bytes)
+
+    _claim(upload, offset)
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(part_path(upload), 'r+b') as part:
+            part.seek(offset)
+            while written < length:
+                block = stream.read(min(READ_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                digest.update(block)
+                part.write(block)
+                written += len(block)
+
+            if written != length or (checksum and digest.hexdigest() != checksum.lower()):
+                part.truncate(offset)
+                reason = "Chunk checksum mismatch." if written == length else "Chunk was truncated."
+                raise UploadError(reason, offset=offset)
+    except Exception:
+        _release(upload, offset, offset)
+        raise
+
+    _release(upload, offset, offset + length)
+    return upload.received_bytes
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete_upload(upload, checksum=None):
+    if upload.status == 'complete':
+        return upload.lesson
+    if upload.received_bytes != upload.total_size:
+        raise UploadError("The upload is not finished yet.", status=409, offset=upload.received_bytes)
+
+    path = part_path(upload)
+    if checksum and _file_sha256(path) != checksum.lower():
+        raise UploadError("File checksum mismatch.", offset=upload.received_bytes)
+
+    # Claimed like a chunk, so a concurrent completion or PUT gets a 409
+    # while the file is copied; the copy itself holds no database lock.
+    _claim(upload, upload.total_size)
+    lesson = upload.lesson
+    try:
+        with open(path, 'rb') as fh:
+            # Storage backends copy File objects chunk by chunk.
+            lesson.video_file.save(upload.filename, File(fh), save=False)
+    except Exception:
+        _release(upload, upload.total_size, upload.total_size)
+        raise
+
+    with transaction.atomic():
+        lesson.save(update_fields=['video_file'])
+        _release(upload, upload.total_size, upload.total_size, status='complete')
+    os.remove(path)
+    return lesson
+
+
+def abort_upload(upload):
+    VideoUpload.objects.filter(id=upload.id, status__in=('uploading', 'writing')).update(status='aborted')
+    if os.path.exists(part_path(upload)):
+        os.remove(part_path(upload))
@@ -12,6 +12,7 @@ urlpatterns = [
     path('my-courses/', views.instructor_course_list, name='instructor_course_list'),
     path('course/<int:course_id>/details/', views.course_detail, name='course_detail'),
     path('course/<int:course_id>/edit/', views.edit_course, name='edit_course'),
+    path('course/<int:course_id>/analytics/', views.course_analytics, name='course_analytics'),
 
     # Lesson
     path('select-course-for-lessons/', views.select_course_for_lessons, name='select_course_for_lessons'),
@@ -19,6 +20,9 @@ urlpatterns = [
     path('lesson/<int:course_id>/add/', views.add_lesson, name='add_lesson'),
     path('lesson/<int:lesson_id>/edit/', views.edit_lesson, name='edit_lesson'),
     path('lesson/<int:lesson_id>/delete/', views.delete_lesson, name='delete_lesson'),
+    path('lesson/<int:lesson_id>/video-upload/', views.start_video_upload, name='start_video_upload'),
+    path('video-upload/<uuid:upload_id>/', views.video_upload, name='video_upload'),
+    path('video-upload/<uuid:upload_id>/complete/', views.complete_video_upload, name='complete_video_upload'),
 
     # Quiz
     path('lesson/<int:lesson_id>/add-question/', views.add_question_with_choices, name='add_question'),
@@ -28,4 +32,5 @@ urlpatterns = [
 
     # Enrollments
     path('enrollments/', views.instructor_enrollments, name='instructor_enrollments'),
+    path('enrollments/export/', views.export_enrollments, name='export_enrollments'),
 ]
@@ -1,17 +1,29 @@
+from datetime import timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_POST, require_http_methods
 from .forms import InstructorRegistrationForm, LessonForm, InstructorProfileForm, CourseForm, QuestionForm, ChoiceFormSet
-from .models import Course, Lesson, Question, Choice
-from student.models import Enrollment
+from .analytics import ANALYTICS_DAYS
+from .models import Course, Lesson, Question, Choice, VideoUpload
+from .reports import EXPORT_FORMATS, export_response, report_courses, roster, roster_page
+from .quiz_cache import bump_quiz_version, get_quiz_questions
+from .transcoding import queue_transcode
+from .uploads import UploadError, abort_upload, chunk_size, complete_upload, start_upload, write_chunk
+from student.counters import adjust_course_counters, refresh_course_counters
+from techademy.replicas import read_replica
 from django.forms import inlineformset_factory
 
 @login_required
 def instructor_dashboard(request):
-    if request.user.role != 'instructor':
-        return redirect('login')
-
-    approved_courses = Course.objects.filter(instructor=request.user, approval_status='approved')
+    approved_courses = Course.objects.filter(
+        instructor=request.user, approval_status='approved'
+    ).select_related('stats').order_by('-created_at')
     pending_courses = Course.objects.filter(instructor=request.user, approval_status='pending')
     rejected_courses = Course.objects.filter(instructor=request.user, approval_status='rejected')
 
@@ -35,9 +47,6 @@ def register_instructor(request):
 
 @login_required
 def instructor_profile(request):
-    if request.user.role != 'instructor':
-        return redirect('login')
-
     if request.method == 'POST':
         form = InstructorProfileForm(request.POST, request.FILES, instance=request.user)
         if form.is_valid():
@@ -50,9 +59,6 @@ def instructor_profile(request):
 
 @login_required
 def add_course(request):
-    if request.user.role != 'instructor':
-        return redirect('login')
-
     if request.method == 'POST':
         form = CourseForm(request.POST, request.FILES)
         if form.is_valid():
@@ -94,10 +100,28 @@ def course_detail(request, course_id):
     })
 
 @login_required
-def instructor_course_list(request):
-    if request.user.role != 'instructor':
-        return redirect('login')
+@read_replica
+def course_analytics(request, course_id):
+    course = get_object_or_404(Course.objects.select_related('stats'), id=course_id, instructor=request.user)
+    daily = list(course.daily_enrollment_stats.filter(
+        day__gte=timezone.localdate() - timedelta(days=ANALYTICS_DAYS)
+    ).order_by('day'))
+    peak = max((row.enrollments for row in daily), default=0)
+
+    return render(request, 'instructor/course_analytics.html', {
+        'course': course,
+        'stats': getattr(course, 'stats', None),
+        'daily': daily,
+        'peak': peak,
+        'lessons': course.lesson_stats.select_related('lesson').order_by('lesson_id'),
+        # Hardest questions first.
+        'questions': course.question_stats.select_related('question__lesson').filter(attempts__gt=0).order_by(
+            F('correct') * 1.0 / F('attempts'), 'question_id'
+        ),
+    })
 
+@login_required
+def instructor_course_list(request):
     approved_courses = Course.objects.filter(instructor=request.user, approval_status='approved')
     pending_courses = Course.objects.filter(instructor=request.user, approval_status='pending')
     rejected_courses = Course.objects.filter(instructor=request.user, approval_status='rejected')
@@ -118,7 +142,11 @@ def add_lesson(request, course_id):
         if form.is_valid():
             lesson = form.save(commit=False)
             lesson.course = course
-            lesson.save()
+            with transaction.atomic():
+                lesson.save()
+                adjust_course_counters(course.id, lessons=1)
+            if lesson.video_file:
+                queue_transcode(lesson)
             lesson_added = lesson
             form = LessonForm()
     else:
@@ -137,6 +165,8 @@ def edit_lesson(request, lesson_id):
         form = LessonForm(request.POST, request.FILES, instance=lesson)
         if form.is_valid():
             form.save()
+            if 'video_file' in form.changed_data:
+                queue_transcode(lesson)
             messages.success(request, 'Lesson updated successfully.')
             return redirect('course_detail', course_id=lesson.course.id)
     else:
@@ -148,6 +178,64 @@ def edit_lesson(request, lesson_id):
         'course': lesson.course,
     })
 
+def _upload_state(upload):
+    return {
+        'upload_id': str(upload.id),
+        'offset': upload.received_bytes,
+        'size': upload.total_size,
+        'status': upload.status,
+        'chunk_size': chunk_size(),
+    }
+
+def _upload_error(exc):
+    return JsonResponse({'error': str(exc), 'offset': exc.offset}, status=exc.status)
+
+@login_required
+@require_POST
+def start_video_upload(request, lesson_id):
+    lesson = get_object_or_404(Lesson, id=lesson_id, course__instructor=request.user)
+    try:
+        upload = start_upload(lesson, request.user, request.POST.get('filename', ''), int(request.POST.get('size', 0)))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid upload size.'}, status=400)
+    except UploadError as exc:
+        return _upload_error(exc)
+    return JsonResponse(_upload_state(upload), status=201)
+
+@login_required
+@require_http_methods(['GET', 'PUT', 'DELETE'])
+def video_upload(request, upload_id):
+    upload = get_object_or_404(VideoUpload, id=upload_id, lesson__course__instructor=request.user)
+
+    if request.method == 'PUT':
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return JsonResponse({'error': 'Missing or invalid Upload-Offset header.'}, status=400)
+        try:
+            write_chunk(upload, offset, request, length, request.headers.get('X-Chunk-SHA256'))
+        except UploadError as exc:
+            return _upload_error(exc)
+    elif request.method == 'DELETE':
+        abort_upload(upload)
+        upload.refresh_from_db()
+
+    return JsonResponse(_upload_state(upload))
+
+@login_required
+@require_POST
+def complete_video_upload(request, upload_id):
+    upload = get_object_or_404(VideoUpload, id=upload_id, lesson__course__instructor=request.user)
+    already_complete = upload.status == 'complete'
+    try:
+        lesson = complete_upload(upload, request.POST.get('sha256'))
+    except UploadError as exc:
+        return _upload_error(exc)
+    if not already_complete:
+        queue_transcode(lesson)
+    return JsonResponse(dict(_upload_state(upload), video_url=lesson.video_file.url))
+
 @login_required
 def manage_lessons(request, course_id):
     course = get_object_or_404(Course, id=course_id, instructor=request.user, approval_status='approved')
@@ -156,9 +244,6 @@ def manage_lessons(request, course_id):
 
 @login_required
 def select_course_for_lessons(request):
-    if request.user.role != 'instructor':
-        return redirect('login')
-
     courses = Course.objects.filter(instructor=request.user, approval_status='approved')
     return render(request, 'instructor/select_course_for_lessons.html', {'courses': courses})
 
@@ -166,7 +251,9 @@ def select_course_for_lessons(request):
 def delete_lesson(request, lesson_id):
     lesson = get_object_or_404(Lesson, id=lesson_id, course__instructor=request.user)
     course_id = lesson.course.id
-    lesson.delete()
+    with transaction.atomic():
+        lesson.delete()
+        refresh_course_counters(course_id)
     messages.success(request, 'Lesson deleted successfully.')
     return redirect('course_detail', course_id=course_id)
 
@@ -179,14 +266,18 @@ def add_question_with_choices(request, lesson_id):
         c_formset = ChoiceFormSet(request.POST)
 
         if q_form.is_valid() and c_formset.is_valid():
-            question = q_form.save(commit=False)
-            question.lesson = lesson
-            question.save()
+            with transaction.atomic():
+                question = q_form.save(commit=False)
+                question.lesson = lesson
+                question.save()
+
+                choices = c_formset.save(commit=False)
+                for choice in choices:
+                    choice.question = question
+                    choice.save()
 
-            choices = c_formset.save(commit=False)
-            for choice in choices:
-                choice.question = question
-                choice.save()
+                adjust_course_counters(lesson.course_id, questions=1)
+            bump_quiz_version(lesson.id)
 
             messages.success(request, "Question and choices added successfully.")
             return redirect('course_detail', course_id=lesson.course.id)
@@ -204,7 +295,7 @@ def add_question_with_choices(request, lesson_id):
 @login_required
 def view_quizzes(request, lesson_id):
     lesson = get_object_or_404(Lesson, id=lesson_id, course__instructor=request.user)
-    questions = Question.objects.filter(lesson=lesson).prefetch_related('choices')
+    questions = get_quiz_questions(lesson.id)
 
     return render(request, 'instructor/lesson_quiz_list.html', {
         'lesson': lesson,
@@ -221,8 +312,10 @@ def edit_question(request, question_id):
         c_formset = ChoiceFormSet(request.POST, instance=question)
 
         if q_form.is_valid() and c_formset.is_valid():
-            q_form.save()
-            c_formset.save()
+            with transaction.atomic():
+                q_form.save()
+                c_formset.save()
+            bump_quiz_version(question.lesson_id)
             messages.success(request, "Quiz updated successfully.")
             return redirect('manage_lessons', course_id=question.lesson.course.id)
     else:
@@ -239,30 +332,44 @@ def edit_question(request, question_id):
 def delete_question(request, question_id):
     question = get_object_or_404(Question, id=question_id, lesson__course__instructor=request.user)
     course_id = question.lesson.course.id
-    question.delete()
+    with transaction.atomic():
+        question.delete()
+        adjust_course_counters(course_id, questions=-1)
+    bump_quiz_version(question.lesson_id)
     messages.success(request, "Quiz deleted successfully.")
     return redirect('course_detail', course_id=course_id)
 
 @login_required
+@read_replica
 def instructor_enrollments(request):
-    if request.user.role != 'instructor':
-        return redirect('login')
-
-    courses = Course.objects.filter(instructor=request.user, approval_status='approved')
-
-    course_data = []
-    for course in courses:
-        enrollments = Enrollment.objects.filter(course=course)
-        students = [enrollment.student for enrollment in enrollments]
-        course_data.append({
-            'course': course,
-            'enrollments': enrollments,
-            'students': students,
-            'count': enrollments.count()
-        })
+    courses = list(report_courses(request.user))
+    selected = next((c for c in courses if str(c.id) == request.GET.get('course')), courses[0] if courses else None)
 
     return render(request, 'instructor/instructor_enrollments.html', {
-        'course_data': course_data
+        'courses': courses,
+        'selected': selected,
+        'page': roster_page(selected, request.GET.get('page')) if selected else None,
     })
 
 
+@login_required
+@read_replica
+def export_enrollments(request):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('Unsupported export format.')
+
+    courses = Course.objects.filter(instructor=request.user, approval_status='approved')
+    filename = 'enrollments'
+    course_id = request.GET.get('course')
+    if course_id:
+        try:
+            course_id = int(course_id)
+        except ValueError:
+            return HttpResponseBadRequest('Invalid course id.')
+        course = get_object_or_404(courses, id=course_id)
+        courses = courses.filter(id=course.id)
+        filename = f'enrollments-course-{course.id}'
+    return export_response(roster(courses.values('id')), export_format, filename)
+
+
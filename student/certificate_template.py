@@ -0,0 +1,123 @@
+from functools import lru_cache
+from io import BytesIO
+
+from django.utils.functional import cached_property
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib import colors
+
+
+# Certificate layout split into a static layer and per-student stamps.
+#
+# The border, headings, signature line and (for per-course templates) the
+# course title make up the static layer. It is drawn once per template into
+# a cached string of PDF page operators (static_layer), and every page
+# copies that string in before stamping the student's name and date, so
+# rendering a certificate only draws the stamps. certificate_template()
+# keeps one template per course title for the life of the process.
+#
+# The operators name fonts by their per-document resource names (/F1,
+# /F2, ...), which reportlab hands out in order of first use; every canvas
+# registers STATIC_FONTS first, in this order, so the names always match.
+# render_book() additionally wraps the layer in one form XObject shared by
+# all the pages of a single PDF.
+
+STATIC_FONTS = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique')
+
+
+class CertificateTemplate:
+    form_name = 'CertificateStatic'
+
+    def __init__(self, course_title=None, pagesize=landscape(A4)):
+        self.course_title = course_title
+        self.pagesize = pagesize
+        self.width, self.height = pagesize
+
+    def _canvas(self, fp):
+        p = canvas.Canvas(fp, pagesize=self.pagesize)
+        for font in STATIC_FONTS:
+            p.setFont(font, 12)
+        return p
+
+    @cached_property
+    def static_layer(self):
+        p = self._canvas(BytesIO())
+        start = len(p._code)
+        self._draw_static(p)
+        return '\n'.join(['q', *p._code[start:], 'Q'])
+
+    def _draw_static(self, p):
+        width, height = self.width, self.height
+
+        p.setStrokeColor(colors.HexColor("#00C6FF"))
+        p.setLineWidth(6)
+        p.rect(40, 40, width - 80, height - 80)
+
+        p.setFont("Helvetica-Bold", 36)
+        p.setFillColor(colors.HexColor("#00C6FF"))
+        p.drawCentredString(width / 2, height - 100, "Certificate of Completion")
+
+        p.setFont("Helvetica", 18)
+        p.setFillColor(colors.black)
+        p.drawCentredString(width / 2, height - 160, "This is to certify that")
+        p.drawCentredString(width / 2, height - 260, "has successfully completed the course")
+
+        if self.course_title is not None:
+            self._draw_course_title(p, self.course_title)
+
+        p.setFont("Helvetica-Oblique", 12)
+        p.setFillColor(colors.gray)
+        p.drawString(100, 80, "Signature:")
+        p.line(160, 82, 300, 82)
+
+    def _draw_course_title(self, p, course_title):
+        p.setFont("Helvetica-Bold", 24)
+        p.setFillColor(colors.HexColor("#0072ff"))
+        p.drawCentredString(self.width / 2, self.height - 310, course_title)
+
+    def _stamp(self, p, student_name, issued_on, course_title=None):
+        p.setFont("Helvetica-Bold", 26)
+        p.setFillColor(colors.darkblue)
+        p.drawCentredString(self.width / 2, self.height - 210, student_name)
+
+        if self.course_title is None:
+            self._draw_course_title(p, course_title or '')
+
+        p.setFont("Helvetica", 14)
+        p.setFillColor(colors.gray)
+        p.drawCentredString(self.width / 2, self.height - 370, f"Issued on: {issued_on.strftime('%d %B %Y')}")
+
+    def render(self, student_name, issued_on, course_title=None):
+        buffer = BytesIO()
+        p = self._canvas(buffer)
+        p.addLiteral(self.static_layer)
+        self._stamp(p, student_name, issued_on, course_title)
+        p.showPage()
+        p.save()
+        return buffer.getvalue()
+
+    def render_many(self, rows):
+        # rows: iterable of (student_name, issued_on[, course_title]); yields one PDF each.
+        for row in rows:
+            yield self.render(*row)
+
+    def render_book(self, rows, fp):
+        # Writes every certificate as a page of a single PDF sharing one static form.
+        p = self._canvas(fp)
+        p.beginForm(self.form_name)
+        p.addLiteral(self.static_layer)
+        p.endForm()
+
+        count = 0
+        for row in rows:
+            p.doForm(self.form_name)
+            self._stamp(p, *row)
+            p.showPage()
+            count += 1
+        p.save()
+        return count
+
+
+@lru_cache(maxsize=256)
+def certificate_template(course_title=None):
+    return CertificateTemplate(course_title)
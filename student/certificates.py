@@ -0,0 +1,139 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .certificate_template import certificate_template
+from .models import Certificate
+
+logger = logging.getLogger(__name__)
+
+
+# Certificate issuance as a background job.
+#
+# The Certificate row is the job: (student, course) is unique, so repeated
+# or concurrent requests share one row, and a worker only renders after it
+# wins the pending -> processing transition. Jobs run on an in-process
+# thread pool ('thread'), are left for the run_certificate_worker command
+# to poll ('db'), or run inline ('sync'), per settings.CERTIFICATE_QUEUE.
+
+_executor = None
+# A job still 'processing' after this long lost its worker (a crash or a
+# restart in 'thread' mode) and is run again when requested.
+STALE_AFTER = timedelta(minutes=10)
+
+
+def render_certificate_pdf(student_name, course_title, issued_on):
+    return certificate_template(course_title).render(student_name, issued_on)
+
+
+def certificate_filename(student, course):
+    return f'{student.username}_{course.title}_certificate.pdf'
+
+
+def request_certificate(student, course):
+    try:
+        with transaction.atomic():
+            cert, _ = Certificate.objects.get_or_create(student=student, course=course)
+    except IntegrityError:
+        # Lost the race against a concurrent request for the same pair.
+        cert = Certificate.objects.get(student=student, course=course)
+
+    retry = Q(status='failed') | Q(status='processing', updated_at__lt=timezone.now() - STALE_AFTER)
+    if cert.status in ('failed', 'processing'):
+        if Certificate.objects.filter(retry, id=cert.id).update(status='pending', error=''):
+            cert.status = 'pending'
+
+    # Enqueueing is idempotent (only one worker can claim the job), so a
+    # pending job orphaned by a restart is simply picked up again here.
+    if cert.status == 'pending' and enqueue_certificate(cert.id):
+        cert.refresh_from_db()
+    return cert
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'CERTIFICATE_WORKERS', 2),
+            thread_name_prefix='certificates',
+        )
+    return _executor
+
+
+def _run_in_thread(certificate_id):
+    close_old_connections()
+    try:
+        run_certificate_job(certificate_id)
+    finally:
+        close_old_connections()
+
+
+def enqueue_certificate(certificate_id):
+    queue = getattr(settings, 'CERTIFICATE_QUEUE', 'thread')
+    # Returns True when the job ran inline and the row is already final.
+    if queue == 'sync':
+        run_certificate_job(certificate_id)
+        return True
+    if queue == 'thread':
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, certificate_id))
+    # 'db': the row is already pending; run_certificate_worker will pick it up.
+    return False
+
+
+def claim_certificate(certificate_id):
+    return Certificate.objects.filter(id=certificate_id, status='pending').update(
+        status='processing', updated_at=timezone.now()
+    ) == 1
+
+
+def run_certificate_job(certificate_id):
+    if not claim_certificate(certificate_id):
+        return False
+
+    cert = Certificate.objects.select_related('student', 'course').get(id=certificate_id)
+    try:
+        pdf = render_certificate_pdf(cert.student.get_full_name(), cert.course.title, cert.issued_on)
+        cert.certificate_file.save(certificate_filename(cert.student, cert.course), ContentFile(pdf), save=False)
+        cert.status = 'ready'
+        cert.error = ''
+        cert.save(update_fields=['certificate_file', 'status', 'error', 'updated_at'])
+    except Exception as exc:
+        logger.exception("Certificate %s failed to render", certificate_id)
+        Certificate.objects.filter(id=certificate_id).update(status='failed', error=str(exc))
+        return False
+    return True
+
+
+def _for_courses(queryset, course_ids):
+    return queryset.filter(course_id__in=course_ids) if course_ids else queryset
+
+
+def claim_certificates(limit, course_ids=None):
+    # Claim up to `limit` pending jobs at once. The claim timestamp doubles
+    # as a token so rows claimed concurrently by another worker are skipped.
+    token = timezone.now()
+    pending = _for_courses(Certificate.objects.filter(status='pending'), course_ids)
+    ids = list(pending.order_by('id').values_list('id', flat=True)[:limit])
+    Certificate.objects.filter(id__in=ids, status='pending').update(status='processing', updated_at=token)
+    return list(
+        Certificate.objects.filter(id__in=ids, status='processing', updated_at=token).select_related('student', 'course')
+    )
+
+
+def requeue_stale_certificates(older_than=STALE_AFTER, course_ids=None):
+    # Jobs left in 'processing' by a worker that died go back to the queue.
+    stale = Certificate.objects.filter(status='processing', updated_at__lt=timezone.now() - older_than)
+    return _for_courses(stale, course_ids).update(status='pending')
+
+
+def run_pending_certificates(limit=None):
+    pending = Certificate.objects.filter(status='pending').order_by('id').values_list('id', flat=True)
+    if limit:
+        pending = pending[:limit]
+    return sum(run_certificate_job(certificate_id) for certificate_id in list(pending))
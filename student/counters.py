@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from instructor.models import Course, Lesson, Question
+from .models import Enrollment, LessonProgress, QuizScore
+
+
+# Write-side maintenance of the denormalized counters on Course and Enrollment.
+# Every helper is safe to call inside the caller's own transaction.
+
+def mark_lesson_completed(student, lesson):
+    with transaction.atomic():
+        progress, created = LessonProgress.objects.select_for_update().get_or_create(
+            student=student, lesson=lesson, defaults={'is_completed': True}
+        )
+        newly_completed = created or not progress.is_completed
+        if not created:
+            progress.is_completed = True
+            progress.save()
+
+        Enrollment.objects.filter(student=student, course_id=lesson.course_id).update(
+            completed_lessons=F('completed_lessons') + int(newly_completed),
+            last_lesson=lesson,
+        )
+    return progress
+
+
+def record_quiz_score(student, lesson, score, total):
+    is_perfect = score == total
+    values = {'score': score, 'total': total, 'is_perfect': is_perfect}
+    with transaction.atomic():
+        # get_or_create re-reads (and locks) the row when a concurrent first
+        # submission wins the insert, so only one of them counts as created.
+        previous, created = QuizScore.objects.select_for_update().get_or_create(
+            student=student, lesson=lesson, defaults=values
+        )
+        was_perfect = False
+        if not created:
+            QuizScore.objects.filter(id=previous.id).update(updated_at=timezone.now(), **values)
+            was_perfect = previous.is_perfect
+        delta = int(is_perfect) - int(was_perfect)
+        if delta:
+            Enrollment.objects.filter(student=student, course_id=lesson.course_id).update(
+                perfect_quizzes=F('perfect_quizzes') + delta
+            )
+
+
+def adjust_course_counters(course_id, lessons=0, questions=0):
+    Course.objects.filter(id=course_id).update(
+        lesson_count=F('lesson_count') + lessons,
+        question_count=F('question_count') + questions,
+    )
+
+
+def _count(queryset, group_by):
+    counted = queryset.order_by().values(group_by).annotate(c=Count('id')).values('c')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def _course_counter_values():
+    return {
+        'lesson_count': _count(Lesson.objects.filter(course=OuterRef('pk')), 'course'),
+        'question_count': _count(
+            Question.objects.filter(lesson__course=OuterRef('pk')), 'lesson__course'
+        ),
+    }
+
+
+def _enrollment_counter_values():
+    return {
+        'completed_lessons': _count(
+            LessonProgress.objects.filter(
+                student=OuterRef('student'), lesson__course=OuterRef('course'), is_completed=True
+            ),
+            'lesson__course',
+        ),
+        'perfect_quizzes': _count(
+            QuizScore.objects.filter(
+                student=OuterRef('student'), lesson__course=OuterRef('course'), is_perfect=True
+            ),
+            'lesson__course',
+        ),
+        'last_lesson': Subquery(
+            LessonProgress.objects.filter(
+                student=OuterRef('student'), lesson__course=OuterRef('course')
+            ).order_by('-watched_on', '-id').values('lesson')[:1]
+        ),
+    }
+
+
+def rebuild_counters(courses=None):
+    # Recompute every counter from the raw rows with one UPDATE per table.
+    if courses is None:
+        courses = Course.objects.all()
+    course_ids = list(courses.values_list('id', flat=True))
+    with transaction.atomic():
+        Course.objects.filter(id__in=course_ids).update(**_course_counter_values())
+        Enrollment.objects.filter(course_id__in=course_ids).update(**_enrollment_counter_values())
+
+
+def refresh_course_counters(course_id):
+    rebuild_counters(Course.objects.filter(id=course_id))
+
+
+def counter_drift(courses=None):
+    # Rows whose stored counters disagree with the raw data.
+    if courses is None:
+        courses = Course.objects.all()
+    course_fields = ['lesson_count', 'question_count']
+    enrollment_fields = ['completed_lessons', 'perfect_quizzes', 'last_lesson']
+
+    drifted_courses = courses.annotate(
+        **{f'actual_{name}': value for name, value in _course_counter_values().items()}
+    )
+    drifted_enrollments = Enrollment.objects.filter(course__in=courses).annotate(
+        **{f'actual_{name}': value for name, value in _enrollment_counter_values().items()}
+    )
+
+    drift = []
+    for course in drifted_courses:
+        for field in course_fields:
+            if getattr(course, field) != getattr(course, f'actual_{field}'):
+                drift.append((course, field, getattr(course, field), getattr(course, f'actual_{field}')))
+    for enrollment in drifted_enrollments:
+        for field in enrollment_fields:
+            stored = getattr(enrollment, f'{field}_id' if field == 'last_lesson' else field)
+            if stored != getattr(enrollment, f'actual_{field}'):
+                drift.append((enrollment, field, stored, getattr(enrollment, f'actual_{field}')))
+    return drift
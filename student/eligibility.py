@@ -0,0 +1,81 @@
+from django.db.models import BooleanField, Case, Count, Exists, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from instructor.models import Lesson, Question
+from .models import Enrollment, LessonProgress, QuizScore
+
+
+# Certificate eligibility: every lesson of the course completed and a
+# full-marks quiz score recorded for every lesson.
+#
+# course_eligibility() answers it for one student and course, with the
+# lessons still missing, in a single query over the course's lessons;
+# eligible_enrollments() and with_certificate_eligibility() do the same for
+# whole enrollment querysets (bulk issuing, the dashboard badge).
+
+def _question_count():
+    counted = Question.objects.filter(lesson=OuterRef('pk')).order_by().values('lesson').annotate(
+        c=Count('id')
+    ).values('c')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def lessons_without_full_marks(student, course):
+    # Lessons of the enrollment's course lacking a QuizScore with full marks.
+    # student and course may be model instances, ids or OuterRef()s.
+    full_marks = QuizScore.objects.filter(
+        student=student, lesson=OuterRef('pk'), score__gte=OuterRef('question_count')
+    )
+    return Lesson.objects.filter(course=course).annotate(
+        question_count=_question_count(),
+        has_full_marks=Exists(full_marks),
+    ).filter(has_full_marks=False)
+
+
+class CourseEligibility:
+    def __init__(self, incomplete, imperfect):
+        # Lessons not completed yet, and lessons without a full-marks score.
+        self.incomplete = incomplete
+        self.imperfect = imperfect
+
+    @property
+    def eligible(self):
+        return not self.incomplete and not self.imperfect
+
+
+def course_eligibility(student, course):
+    lessons = Lesson.objects.filter(course=course).annotate(
+        question_count=_question_count(),
+        completed=Exists(LessonProgress.objects.filter(student=student, lesson=OuterRef('pk'), is_completed=True)),
+        best_score=Subquery(QuizScore.objects.filter(student=student, lesson=OuterRef('pk')).values('score')[:1]),
+    ).order_by('id')
+
+    incomplete, imperfect = [], []
+    for lesson in lessons:
+        if not lesson.completed:
+            incomplete.append(lesson)
+        if lesson.best_score is None or lesson.best_score < lesson.question_count:
+            imperfect.append(lesson)
+    return CourseEligibility(incomplete, imperfect)
+
+
+def with_certificate_eligibility(enrollments):
+    # Annotates certificate_eligible; the quiz check only matters (and is
+    # only decisive) once every lesson is completed.
+    missing_quiz = lessons_without_full_marks(OuterRef(OuterRef('student')), OuterRef('course'))
+    return enrollments.annotate(
+        missing_quiz=Exists(missing_quiz),
+        certificate_eligible=Case(
+            When(completed_lessons__gte=F('course__lesson_count'), missing_quiz=False, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ),
+    )
+
+
+def eligible_enrollments(enrollments=None):
+    if enrollments is None:
+        enrollments = Enrollment.objects.all()
+    return with_certificate_eligibility(enrollments).filter(
+        completed_lessons__gte=F('course__lesson_count'), missing_quiz=False,
+    )
@@ -0,0 +1,75 @@
+import uuid
+
+from django.core.cache import cache
+
+from techademy.cache import is_shared_cache
+from .models import Enrollment
+
+
+# The set of course ids a user is enrolled in, cached per request and in
+# the session, so enrollment checks are set lookups instead of queries.
+#
+# The session copy is tagged with a per-user version token from the cache;
+# the Enrollment signals in student.signals replace the token whenever the
+# user's enrollments change (enrolling, paying, an admin removing one), so
+# every session of that user reloads the set on its next request. A token
+# that is missing (evicted, expired) is replaced, which is a miss as well.
+# The token must be visible to every worker, so with a per-process default
+# cache the session copy is not used and each request queries once.
+
+SESSION_KEY = 'enrolled_course_ids'
+VERSION_TIMEOUT = 30 * 24 * 60 * 60
+
+
+def _version_key(user_id):
+    return f'enrollments:version:{user_id}'
+
+
+def enrollments_changed(user_id):
+    cache.set(_version_key(user_id), uuid.uuid4().hex, VERSION_TIMEOUT)
+
+
+def _enrollments_version(user_id):
+    if not is_shared_cache():
+        return None
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def enrolled_course_ids(request):
+    user = request.user
+    if not user.is_authenticated:
+        return frozenset()
+
+    cached = getattr(request, '_enrolled_course_ids', None)
+    if cached is not None:
+        return cached
+
+    version = _enrollments_version(user.id)
+    stored = request.session.get(SESSION_KEY)
+    if version is not None and stored and stored.get('user') == user.id and stored.get('version') == version:
+        ids = frozenset(stored['ids'])
+    else:
+        ids = frozenset(Enrollment.objects.filter(student=user).values_list('course_id', flat=True))
+        if version is not None:
+            request.session[SESSION_KEY] = {'user': user.id, 'version': version, 'ids': sorted(ids)}
+        else:
+            request.session.pop(SESSION_KEY, None)
+
+    request._enrolled_course_ids = ids
+    return ids
+
+
+def forget_enrollments(request):
+    # For views that change the current user's enrollments: the next check
+    # reloads them even before the version bump is visible.
+    request.session.pop(SESSION_KEY, None)
+    request.__dict__.pop('_enrolled_course_ids', None)
+
+
+def is_enrolled(request, course_id):
+    return course_id in enrolled_course_ids(request)
@@ -0,0 +1,213 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from instructor.models import Question
+from instructor.quiz_cache import get_quiz_questions
+from .models import Enrollment, QuizAnswer, QuizScore
+from .counters import record_quiz_score
+
+
+# Quiz grading against an in-memory answer key.
+#
+# The key for a lesson comes from the versioned quiz cache, or uncached from
+# a single LEFT JOIN of questions to their choices; grading a submission
+# after that is pure Python, so the cost of a quiz no longer grows with its
+# number of questions. Each graded submission is also appended to the
+# QuizAnswer log, one row per question, with a single bulk_create.
+
+MAX_LATENCY_MS = 60 * 60 * 1000
+PRUNE_BATCH = 5000
+
+class AnswerKey:
+    def __init__(self, lesson_id, questions):
+        # questions: list of (question_id, text, {choice_id: (text, is_correct)})
+        self.lesson_id = lesson_id
+        self.questions = questions
+
+    @classmethod
+    def for_lesson(cls, lesson):
+        rows = Question.objects.filter(lesson=lesson).order_by('id', 'choices__id').values_list(
+            'id', 'text', 'choices__id', 'choices__text', 'choices__is_correct'
+        )
+        questions = {}
+        for question_id, text, choice_id, choice_text, is_correct in rows:
+            _, _, choices = questions.setdefault(question_id, (question_id, text, {}))
+            if choice_id is not None:
+                choices[choice_id] = (choice_text, is_correct)
+        return cls(lesson.id, list(questions.values()))
+
+    @classmethod
+    def from_questions(cls, lesson_id, questions):
+        # Build the key from already loaded questions with prefetched choices.
+        return cls(lesson_id, [
+            (question.id, question.text, {
+                choice.id: (choice.text, choice.is_correct) for choice in question.choices.all()
+            })
+            for question in questions
+        ])
+
+    @classmethod
+    def cached(cls, lesson):
+        return cls.from_questions(lesson.id, get_quiz_questions(lesson.id))
+
+    @property
+    def total(self):
+        return len(self.questions)
+
+
+class GradeResult:
+    def __init__(self, score, total, incorrect_answers, answers=()):
+        self.score = score
+        self.total = total
+        self.incorrect_answers = incorrect_answers
+        # (question_id, selected choice id or None, is_correct) per question.
+        self.answers = answers
+
+    @property
+    def is_perfect(self):
+        return self.score == self.total
+
+
+def _choice_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def grade(answer_key, answers):
+    # answers maps question ids to the selected choice id, e.g. request.POST
+    # flattened to {question_id: value} or any dict built offline.
+    correct = 0
+    incorrect_answers = []
+    graded = []
+
+    for question_id, text, choices in answer_key.questions:
+        selected_id = _choice_id(answers.get(question_id))
+        selected = choices.get(selected_id)
+        is_correct = bool(selected and selected[1])
+        graded.append((question_id, selected_id if selected else None, is_correct))
+
+        if is_correct:
+            correct += 1
+        else:
+            correct_text = next((choice_text for choice_text, is_correct in choices.values() if is_correct), None)
+            incorrect_answers.append({
+                'question': text,
+                'your_answer': selected[0] if selected else "No answer",
+                'correct_answer': correct_text or "N/A"
+            })
+
+    return GradeResult(correct, answer_key.total, incorrect_answers, graded)
+
+
+def answers_from_post(answer_key, data):
+    return {
+        question_id: data.get(f'question_{question_id}')
+        for question_id, _, _ in answer_key.questions
+    }
+
+
+def latencies_from_post(answer_key, data):
+    # latency_<question id> fields are filled in by the quiz page's script;
+    # missing or implausible values are stored as unknown.
+    latencies = {}
+    for question_id, _, _ in answer_key.questions:
+        try:
+            value = int(data.get(f'latency_{question_id}', ''))
+        except ValueError:
+            continue
+        if 0 <= value <= MAX_LATENCY_MS:
+            latencies[question_id] = value
+    return latencies
+
+
+def answer_log_rows(student_id, lesson_id, result, latencies=None, answered_at=None):
+    attempt = uuid.uuid4()
+    answered_at = answered_at or timezone.now()
+    latencies = latencies or {}
+    return [
+        QuizAnswer(
+            attempt=attempt, student_id=student_id, lesson_id=lesson_id, question_id=question_id,
+            selected_choice_id=choice_id, is_correct=is_correct,
+            latency_ms=latencies.get(question_id), answered_at=answered_at,
+        )
+        for question_id, choice_id, is_correct in result.answers
+    ]
+
+
+def prune_answer_log(retention_days=None, batch_size=PRUNE_BATCH):
+    # Deletes answers older than the retention period in short batches, so
+    # concurrent submissions never wait long on the table; returns the count.
+    if retention_days is None:
+        retention_days = getattr(settings, 'QUIZ_ANSWER_RETENTION_DAYS', 365)
+    expired = QuizAnswer.objects.filter(answered_at__lt=timezone.now() - timedelta(days=retention_days))
+    deleted = 0
+    while True:
+        ids = list(expired.order_by('answered_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += QuizAnswer.objects.filter(id__in=ids).delete()[0]
+
+
+def grade_submission(student, lesson, data, answer_key=None):
+    answer_key = answer_key or AnswerKey.cached(lesson)
+    result = grade(answer_key, answers_from_post(answer_key, data))
+    record_quiz_score(student, lesson, result.score, result.total)
+    QuizAnswer.objects.bulk_create(
+        answer_log_rows(student.id, lesson.id, result, latencies_from_post(answer_key, data))
+    )
+    return result
+
+
+def grade_submissions(lesson, submissions, answer_key=None):
+    # Offline/bulk grading: submissions is an iterable of (student_id, answers).
+    # The key is loaded once and the scores and perfect-quiz counters are
+    # written with a fixed number of statements however many students there are.
+    answer_key = answer_key or AnswerKey.cached(lesson)
+    results = {student_id: grade(answer_key, answers) for student_id, answers in submissions}
+    if not results:
+        return results
+
+    with transaction.atomic():
+        existing = {
+            score.student_id: score
+            for score in QuizScore.objects.select_for_update().filter(lesson=lesson, student_id__in=results)
+        }
+        gained, lost, to_update, to_create = [], [], [], []
+
+        for student_id, result in results.items():
+            score = existing.get(student_id)
+            was_perfect = bool(score and score.is_perfect)
+            if result.is_perfect != was_perfect:
+                (gained if result.is_perfect else lost).append(student_id)
+
+            if score is None:
+                score = QuizScore(student_id=student_id, lesson=lesson)
+                to_create.append(score)
+            else:
+                to_update.append(score)
+            score.score, score.total, score.is_perfect = result.score, result.total, result.is_perfect
+
+        now = timezone.now()
+        for score in to_update:
+            score.updated_at = now
+        QuizScore.objects.bulk_create(to_create)
+        QuizScore.objects.bulk_update(to_update, ['score', 'total', 'is_perfect', 'updated_at'])
+        QuizAnswer.objects.bulk_create(
+            row for student_id, result in results.items()
+            for row in answer_log_rows(student_id, lesson.id, result, answered_at=now)
+        )
+
+        enrollments = Enrollment.objects.filter(course_id=lesson.course_id)
+        if gained:
+            enrollments.filter(student_id__in=gained).update(perfect_quizzes=F('perfect_quizzes') + 1)
+        if lost:
+            enrollments.filter(student_id__in=lost).update(perfect_quizzes=F('perfect_quizzes') - 1)
+
+    return results
@@ -0,0 +1,47 @@
+import time
+import tracemalloc
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from student.certificate_template import CertificateTemplate
+
+
+class Command(BaseCommand):
+    help = 'Measure per-certificate render time and peak memory for one-file-per-student and batch rendering.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                            help='Numbers of certificates to render (default: 1000 10000).')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Skip the (slower) tracemalloc pass that measures peak memory.')
+
+    def handle(self, *args, **options):
+        template = CertificateTemplate('Introduction to Django')
+        issued_on = timezone.now().date()
+
+        def per_file(rows):
+            for _ in template.render_many(rows):
+                pass
+
+        def book(rows):
+            template.render_book(rows, BytesIO())
+
+        self.stdout.write(f"{'renderer':<10} {'count':>7} {'total s':>9} {'ms/cert':>8} {'peak MiB':>9}")
+        for size in options['sizes']:
+            rows = [(f'Student {i}', issued_on) for i in range(size)]
+            for label, renderer in (('per-file', per_file), ('book', book)):
+                started = time.perf_counter()
+                renderer(rows)
+                elapsed = time.perf_counter() - started
+
+                peak = '-'
+                if not options['no_memory']:
+                    # Timed separately: tracemalloc slows allocation-heavy code a lot.
+                    tracemalloc.start()
+                    renderer(rows)
+                    peak = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f}"
+                    tracemalloc.stop()
+
+                self.stdout.write(f"{label:<10} {size:>7} {elapsed:>9.2f} {elapsed / size * 1000:>8.3f} {peak:>9}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from student.progress_buffer import flush_lesson_views
+
+
+class Command(BaseCommand):
+    help = 'Write buffered repeat lesson views to the database. Run it every minute or so.'
+
+    def handle(self, *args, **options):
+        updated = flush_lesson_views()
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} lesson progress row(s)."))
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from student.certificates import (
+    certificate_filename, claim_certificates, render_certificate_pdf, requeue_stale_certificates,
+)
+from student.eligibility import eligible_enrollments
+from student.models import Certificate
+
+
+def render_row(row):
+    # Runs in the worker processes; reportlab only, no database access. Each
+    # worker keeps its per-course templates, so only the stamps are drawn.
+    student_name, course_title, issued_on = row
+    return render_certificate_pdf(student_name, course_title, issued_on)
+
+
+class Command(BaseCommand):
+    help = 'Issue certificates to every eligible (student, course) pair, rendering PDFs across a process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='course_ids',
+                            help='Only issue for this course id (repeatable).')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Certificates created, rendered and saved per batch.')
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes used to render PDFs.')
+        parser.add_argument('--retry-failed', action='store_true', help='Requeue certificates that failed before.')
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help='Requeue jobs left in processing for longer than this (e.g. after a crash).')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the eligible pairs.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        enrollments = eligible_enrollments().exclude(
+            Exists(Certificate.objects.filter(student=OuterRef('student'), course=OuterRef('course')))
+        )
+        if options['course_ids']:
+            enrollments = enrollments.filter(course_id__in=options['course_ids'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{enrollments.count()} eligible pair(s) without a certificate.")
+            return
+
+        # Every eligible pair becomes a pending row first, so an interrupted
+        # run resumes from the remaining pending/stale rows on the next call.
+        # bulk_create(ignore_conflicts=True) returns skipped rows too, so the
+        # queued count is the growth of the table.
+        certificates = Certificate.objects.all()
+        if options['course_ids']:
+            certificates = certificates.filter(course_id__in=options['course_ids'])
+        existing = certificates.count()
+        pairs = enrollments.values_list('student_id', 'course_id').order_by('id').iterator(chunk_size=chunk_size)
+        batch = []
+        for student_id, course_id in pairs:
+            batch.append(Certificate(student_id=student_id, course_id=course_id))
+            if len(batch) == chunk_size:
+                Certificate.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            Certificate.objects.bulk_create(batch, ignore_conflicts=True)
+        self.stdout.write(f"Queued {certificates.count() - existing} certificate(s).")
+
+        if options['retry_failed']:
+            certificates.filter(status='failed').update(status='pending', error='')
+        requeue_stale_certificates(timedelta(minutes=options['stale_minutes']), options['course_ids'])
+
+        # Forked workers must not inherit open database connections.
+        connections.close_all()
+        issued = 0
+        with ProcessPoolExecutor(max_workers=options['processes']) as pool:
+            while True:
+                certs = claim_certificates(chunk_size, options['course_ids'])
+                if not certs:
+                    break
+
+                rows = [(c.student.get_full_name(), c.course.title, c.issued_on) for c in certs]
+                pdfs = pool.map(render_row, rows, chunksize=max(1, len(rows) // (4 * options['processes'])))
+                now = timezone.now()
+                for cert, pdf in zip(certs, pdfs):
+                    cert.certificate_file.save(certificate_filename(cert.student, cert.course), ContentFile(pdf), save=False)
+                    cert.status = 'ready'
+                    cert.error = ''
+                    cert.updated_at = now
+                Certificate.objects.bulk_update(certs, ['certificate_file', 'status', 'error', 'updated_at'])
+
+                issued += len(certs)
+                self.stdout.write(f"Issued {issued} certificate(s)...")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {issued} certificate(s) issued."))
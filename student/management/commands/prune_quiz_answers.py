@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from student.grading import prune_answer_log
+
+
+class Command(BaseCommand):
+    help = 'Delete quiz answer log rows older than QUIZ_ANSWER_RETENTION_DAYS. Run it daily.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Keep this many days instead of the setting.')
+
+    def handle(self, *args, **options):
+        deleted = prune_answer_log(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} quiz answer(s)."))
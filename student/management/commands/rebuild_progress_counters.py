@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from instructor.models import Course
+from student.counters import counter_drift, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized progress counters on Course and Enrollment and verify them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='course_ids',
+                            help='Only process this course id (repeatable).')
+        parser.add_argument('--check', action='store_true',
+                            help='Only report drifted counters; exit non-zero if any are found.')
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options['course_ids']:
+            courses = courses.filter(id__in=options['course_ids'])
+
+        if not options['check']:
+            rebuild_counters(courses)
+            self.stdout.write(f"Rebuilt counters for {courses.count()} course(s).")
+
+        drift = counter_drift(courses)
+        for obj, field, stored, actual in drift:
+            self.stderr.write(f"{obj._meta.label} #{obj.pk} {field}: stored={stored} actual={actual}")
+
+        if drift:
+            raise CommandError(f"{len(drift)} counter(s) out of date.")
+        self.stdout.write(self.style.SUCCESS('All counters verified.'))
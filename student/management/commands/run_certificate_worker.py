@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from student.certificates import requeue_stale_certificates, run_pending_certificates
+
+
+class Command(BaseCommand):
+    help = 'Render pending certificates queued with CERTIFICATE_QUEUE = "db".'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--batch', type=int, default=50, help='Jobs to claim per pass.')
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help='Requeue jobs stuck in processing for longer than this.')
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options['stale_minutes'])
+        while True:
+            requeued = requeue_stale_certificates(stale_after)
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale certificate job(s).")
+
+            rendered = run_pending_certificates(options['batch'])
+            if rendered:
+                self.stdout.write(f"Rendered {rendered} certificate(s).")
+
+            if options['once']:
+                break
+            if not rendered:
+                time.sleep(options['interval'])
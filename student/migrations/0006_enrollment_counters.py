@@ -0,0 +1,71 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:32
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def _count(queryset, group_by):
+    counted = queryset.order_by().values(group_by).annotate(c=Count('id')).values('c')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Course = apps.get_model('instructor', 'Course')
+    Lesson = apps.get_model('instructor', 'Lesson')
+    Question = apps.get_model('instructor', 'Question')
+    Enrollment = apps.get_model('student', 'Enrollment')
+    LessonProgress = apps.get_model('student', 'LessonProgress')
+    QuizScore = apps.get_model('student', 'QuizScore')
+
+    Course.objects.update(
+        lesson_count=_count(Lesson.objects.filter(course=OuterRef('pk')), 'course'),
+        question_count=_count(Question.objects.filter(lesson__course=OuterRef('pk')), 'lesson__course'),
+    )
+    Enrollment.objects.update(
+        completed_lessons=_count(
+            LessonProgress.objects.filter(
+                student=OuterRef('student'), lesson__course=OuterRef('course'), is_completed=True
+            ),
+            'lesson__course',
+        ),
+        perfect_quizzes=_count(
+            QuizScore.objects.filter(
+                student=OuterRef('student'), lesson__course=OuterRef('course'), is_perfect=True
+            ),
+            'lesson__course',
+        ),
+        last_lesson=Subquery(
+            LessonProgress.objects.filter(
+                student=OuterRef('student'), lesson__course=OuterRef('course')
+            ).order_by('-watched_on', '-id').values('lesson')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0006_course_counters'),
+        ('student', '0005_certificate_certificate_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='last_lesson',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='instructor.Lesson'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='perfect_quizzes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
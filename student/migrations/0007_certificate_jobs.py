@@ -0,0 +1,47 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:37
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def prepare_existing_certificates(apps, schema_editor):
+    Certificate = apps.get_model('student', 'Certificate')
+
+    # Keep the oldest certificate per (student, course) so the pair can be unique.
+    keep = Certificate.objects.values('student', 'course').annotate(first_id=Min('id')).values('first_id')
+    Certificate.objects.exclude(id__in=keep).delete()
+
+    Certificate.objects.exclude(certificate_file='').exclude(certificate_file=None).update(status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('instructor', '0007_course_search_index'),
+        ('student', '0006_enrollment_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(prepare_existing_certificates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='certificate',
+            unique_together={('student', 'course')},
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def dedupe_quiz_scores(apps, schema_editor):
+    QuizScore = apps.get_model('student', 'QuizScore')
+    Enrollment = apps.get_model('student', 'Enrollment')
+
+    # Keep the best (then most recent) score per (student, lesson) so the
+    # pair can be unique, and recount perfect_quizzes where rows went away.
+    duplicated = QuizScore.objects.values('student', 'lesson').annotate(n=Count('id')).filter(n__gt=1)
+    for pair in duplicated:
+        scores = QuizScore.objects.filter(student=pair['student'], lesson=pair['lesson']).order_by('-score', '-id')
+        keep = scores.values_list('id', flat=True)[0]
+        scores.exclude(id=keep).delete()
+
+        enrollment = Enrollment.objects.filter(
+            student=pair['student'], course__lessons=pair['lesson']
+        ).first()
+        if enrollment is not None:
+            enrollment.perfect_quizzes = QuizScore.objects.filter(
+                student=pair['student'], lesson__course=enrollment.course_id, is_perfect=True
+            ).count()
+            enrollment.save(update_fields=['perfect_quizzes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('instructor', '0011_hot_path_indexes'),
+        ('student', '0007_certificate_jobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_quiz_scores, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='quizscore',
+            unique_together={('student', 'lesson')},
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(condition=models.Q(status__in=['pending', 'processing']), fields=['status', 'id'], name='certificate_queue_idx'),
+        ),
+    ]
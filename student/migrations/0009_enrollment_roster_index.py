@@ -0,0 +1,17 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'enrolled_on', 'id'], name='enrollment_roster_idx'),
+        ),
+    ]
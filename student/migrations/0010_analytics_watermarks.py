@@ -0,0 +1,30 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0009_enrollment_roster_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizscore',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['enrolled_on'], name='enrollment_enrolled_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(fields=['watched_on'], name='progress_watched_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizscore',
+            index=models.Index(fields=['updated_at'], name='quizscore_updated_at_idx'),
+        ),
+    ]
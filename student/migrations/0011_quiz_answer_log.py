@@ -0,0 +1,39 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0012_analytics_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('student', '0010_analytics_watermarks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAnswer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt', models.UUIDField()),
+                ('is_correct', models.BooleanField()),
+                ('latency_ms', models.PositiveIntegerField(null=True)),
+                ('answered_at', models.DateTimeField()),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='instructor.Lesson')),
+                ('question', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='instructor.Question')),
+                ('selected_choice', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='instructor.Choice')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='quizanswer',
+            index=models.Index(fields=['question', 'is_correct'], name='quizanswer_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizanswer',
+            index=models.Index(fields=['answered_at'], name='quizanswer_answered_at_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0011_quiz_answer_log'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='certificate',
+            name='certificate_queue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['status', 'id'], name='certificate_queue_idx'),
+        ),
+    ]
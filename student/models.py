@@ -1,6 +1,6 @@
 from django.db import models
 from accounts.models import CustomUser
-from instructor.models import Course, Lesson
+from instructor.models import Choice, Course, Lesson, Question
 from django.conf import settings
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -9,9 +9,18 @@ class Enrollment(models.Model):
     student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='enrollments')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
     enrolled_on = models.DateTimeField(auto_now_add=True)
+    completed_lessons = models.PositiveIntegerField(default=0)
+    perfect_quizzes = models.PositiveIntegerField(default=0)
+    last_lesson = models.ForeignKey(Lesson, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
 
     class Meta:
         unique_together = ('student', 'course')
+        indexes = [
+            # Course rosters in enrollment order (instructor.reports).
+            models.Index(fields=['course', 'enrolled_on', 'id'], name='enrollment_roster_idx'),
+            # Courses with new enrollments since the last analytics rollup.
+            models.Index(fields=['enrolled_on'], name='enrollment_enrolled_on_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.email} enrolled in {self.course.title}"
@@ -24,15 +33,36 @@ class LessonProgress(models.Model):
 
     class Meta:
         unique_together = ('student', 'lesson')
+        indexes = [
+            # Lessons watched since the last analytics rollup.
+            models.Index(fields=['watched_on'], name='progress_watched_on_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.email} - {self.lesson.title} - {'Completed' if self.is_completed else 'Pending'}"
 
 class Certificate(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    )
+
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     issued_on = models.DateField(auto_now_add=True)
     certificate_file = models.FileField(upload_to='certificates/', blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'course')
+        indexes = [
+            # Jobs waiting for or held by a certificate worker.
+            models.Index(fields=['status', 'id'], name='certificate_queue_idx'),
+        ]
 
     def __str__(self):
         return f"Certificate for {self.student} - {self.course.title}"
@@ -43,6 +73,40 @@ class QuizScore(models.Model):
     score = models.IntegerField()
     total = models.IntegerField()
     is_perfect = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # grading and counters look scores up with update_or_create on this pair.
+        unique_together = ('student', 'lesson')
+        indexes = [
+            # Scores recorded since the last analytics rollup.
+            models.Index(fields=['updated_at'], name='quizscore_updated_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.lesson.title} ({self.score}/{self.total})"
+
+
+class QuizAnswer(models.Model):
+    # Append-only log of every answer in every quiz submission, for item
+    # statistics (instructor.analytics). Rows are never updated; the rows of
+    # one submission share an attempt id, and prune_quiz_answers drops rows
+    # older than QUIZ_ANSWER_RETENTION_DAYS.
+    attempt = models.UUIDField()
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='+')
+    # Indexed through quizanswer_item_idx.
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='+', db_index=False)
+    selected_choice = models.ForeignKey(Choice, on_delete=models.SET_NULL, null=True, related_name='+')
+    is_correct = models.BooleanField()
+    # Milliseconds from opening the quiz to the last change of this answer.
+    latency_ms = models.PositiveIntegerField(null=True)
+    answered_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Per-question correct/attempt counts.
+            models.Index(fields=['question', 'is_correct'], name='quizanswer_item_idx'),
+            # Pruning by age.
+            models.Index(fields=['answered_at'], name='quizanswer_answered_at_idx'),
+        ]
@@ -0,0 +1,53 @@
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from instructor.models import Lesson
+from .eligibility import with_certificate_eligibility
+from .models import Certificate, Enrollment, LessonProgress
+
+
+def enrollments_with_progress(student):
+    # Lesson totals and completion counts are stored on Course/Enrollment
+    # (see student.counters); only the next lesson, certificate eligibility
+    # and whether an issued certificate is ready are resolved per query.
+    completed = LessonProgress.objects.filter(
+        student=OuterRef(OuterRef('student')), lesson=OuterRef('pk'), is_completed=True
+    )
+    course_lessons = Lesson.objects.filter(course=OuterRef('course')).order_by('id')
+    ready = Certificate.objects.filter(student=OuterRef('student'), course=OuterRef('course'), status='ready')
+
+    enrollments = Enrollment.objects.filter(student=student).select_related('course')
+    return with_certificate_eligibility(enrollments).annotate(
+        next_lesson_id=Coalesce(
+            Subquery(
+                course_lessons.annotate(done=Exists(completed)).filter(done=False).values('id')[:1]
+            ),
+            Subquery(course_lessons.values('id')[:1]),
+        ),
+        certificate_ready=Exists(ready),
+    ).order_by('id')
+
+
+def student_progress(student):
+    # Two queries regardless of how many courses the student is enrolled in:
+    # one annotated enrollment query and one bulk fetch of the next lessons.
+    enrollments = list(enrollments_with_progress(student))
+    next_lessons = Lesson.objects.in_bulk(
+        [e.next_lesson_id for e in enrollments if e.next_lesson_id]
+    )
+
+    progress_data = []
+    for enrollment in enrollments:
+        total = enrollment.course.lesson_count
+        completed = min(enrollment.completed_lessons, total)
+        progress_data.append({
+            'enrollment': enrollment,
+            'course': enrollment.course,
+            'total_lessons': total,
+            'completed_lessons': completed,
+            'progress': int((completed / total) * 100) if total else 0,
+            'next_lesson': next_lessons.get(enrollment.next_lesson_id),
+            'certificate_eligible': enrollment.certificate_eligible,
+            'certificate_ready': enrollment.certificate_ready,
+        })
+    return progress_data
@@ -0,0 +1,177 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from techademy.cache import is_shared_cache
+from .counters import mark_lesson_completed
+from .models import Enrollment, LessonProgress
+
+
+# Coalesced writes for lesson views.
+#
+# Only the first view of a lesson changes anything that matters (the
+# completion and the enrollment counters), so that one is written through
+# with mark_lesson_completed(). Later views only move LessonProgress.watched_on
+# and Enrollment.last_lesson; they are collected in the default cache, one
+# entry per (student, lesson) however often the page is refreshed, and
+# written with bulk_update() by the request that finds PROGRESS_FLUSH_SIZE
+# views pending or the oldest one PROGRESS_FLUSH_INTERVAL seconds old, or by
+# `manage.py flush_lesson_views` (run it from cron so a quiet site flushes
+# too). Enrollments whose last_lesson is already right are not written. A
+# cache marker remembers completed lessons, so a repeat view costs no query.
+#
+# The buffer is a numbered log of (student, lesson) slots next to the
+# per-pair entries: a pair gets a slot when its entry is created, and a
+# flush reads the slots between the flushed and the latest number. It lives
+# in the cache so every worker shares it and a killed worker loses nothing;
+# with a per-process cache (or PROGRESS_FLUSH_INTERVAL = 0) every view is
+# written immediately. A view that races a flush may be dropped, which only
+# leaves watched_on a little behind.
+
+COMPLETED_MARKER_TIMEOUT = 24 * 60 * 60
+BUFFER_TIMEOUT = 60 * 60
+FLUSH_LOCK_TIMEOUT = 60
+MAX_FLUSH_SLOTS = 10000
+
+SEQ_KEY = 'progress:views:seq'
+FLUSHED_KEY = 'progress:views:flushed'
+SINCE_KEY = 'progress:views:since'
+LOCK_KEY = 'progress:views:flushing'
+
+
+def _marker_key(student_id, lesson_id):
+    return f'progress:completed:{student_id}:{lesson_id}'
+
+
+def _view_key(student_id, lesson_id):
+    return f'progress:view:{student_id}:{lesson_id}'
+
+
+def _slot_key(number):
+    return f'progress:views:slot:{number}'
+
+
+def _flush_interval():
+    return getattr(settings, 'PROGRESS_FLUSH_INTERVAL', 30)
+
+
+def _flush_size():
+    return getattr(settings, 'PROGRESS_FLUSH_SIZE', 500)
+
+
+def _buffered():
+    return _flush_interval() > 0 and is_shared_cache()
+
+
+def record_lesson_view(student, lesson):
+    # Returns True when this view completed the lesson (written through).
+    key = _marker_key(student.id, lesson.id)
+    if not cache.get(key):
+        completed = LessonProgress.objects.filter(student=student, lesson=lesson, is_completed=True).exists()
+        if not completed:
+            mark_lesson_completed(student, lesson)
+            cache.set(key, True, COMPLETED_MARKER_TIMEOUT)
+            return True
+        cache.set(key, True, COMPLETED_MARKER_TIMEOUT)
+
+    now = timezone.now()
+    if not _buffered():
+        _write_views({(student.id, lesson.id): (lesson.course_id, now)})
+        return False
+
+    view_key = _view_key(student.id, lesson.id)
+    if cache.add(view_key, (lesson.course_id, now), BUFFER_TIMEOUT):
+        cache.set(_slot_key(_next_slot()), (student.id, lesson.id), BUFFER_TIMEOUT)
+        cache.add(SINCE_KEY, now, None)
+    else:
+        cache.set(view_key, (lesson.course_id, now), BUFFER_TIMEOUT)
+
+    since = cache.get(SINCE_KEY)
+    if pending_views() >= _flush_size() or (since and (now - since).total_seconds() >= _flush_interval()):
+        flush_lesson_views()
+    return False
+
+
+def _next_slot():
+    cache.add(SEQ_KEY, 0, None)
+    try:
+        return cache.incr(SEQ_KEY)
+    except ValueError:  # evicted in between
+        cache.add(SEQ_KEY, 0, None)
+        return cache.incr(SEQ_KEY)
+
+
+def _slot_range():
+    state = cache.get_many([SEQ_KEY, FLUSHED_KEY])
+    latest, flushed = state.get(SEQ_KEY, 0), state.get(FLUSHED_KEY, 0)
+    if flushed > latest:
+        flushed = 0  # the counter was evicted and started again
+    return max(flushed, latest - MAX_FLUSH_SLOTS), latest
+
+
+def pending_views():
+    flushed, latest = _slot_range()
+    return latest - flushed
+
+
+def flush_lesson_views():
+    # Writes every buffered view; returns the number of LessonProgress rows updated.
+    if not cache.add(LOCK_KEY, True, FLUSH_LOCK_TIMEOUT):
+        return 0  # another worker is flushing
+    try:
+        flushed, latest = _slot_range()
+        slot_keys = [_slot_key(number) for number in range(flushed + 1, latest + 1)]
+        pairs = list(cache.get_many(slot_keys).values())
+        view_keys = [_view_key(*pair) for pair in pairs]
+        views = cache.get_many(view_keys)
+        cache.set(FLUSHED_KEY, latest, None)
+        cache.delete_many(slot_keys + view_keys + [SINCE_KEY])
+    finally:
+        cache.delete(LOCK_KEY)
+    return _write_views({pair: views[_view_key(*pair)] for pair in pairs if _view_key(*pair) in views})
+
+
+def _write_views(events):
+    # events: (student_id, lesson_id) -> (course_id, viewed_at)
+    if not events:
+        return 0
+
+    # Filter on both id sets and match pairs here; an OR per pair would nest
+    # too deep for SQLite on a full buffer.
+    student_ids = {student_id for student_id, _ in events}
+    rows = [
+        row for row in LessonProgress.objects.filter(
+            student_id__in=student_ids, lesson_id__in={lesson_id for _, lesson_id in events}
+        ).only('id', 'student_id', 'lesson_id')
+        if (row.student_id, row.lesson_id) in events
+    ]
+    for row in rows:
+        row.watched_on = events[(row.student_id, row.lesson_id)][1]
+
+    # The latest view per enrollment decides its last_lesson.
+    latest = {}
+    for (student_id, lesson_id), (course_id, viewed_at) in events.items():
+        current = latest.get((student_id, course_id))
+        if current is None or viewed_at > current[1]:
+            latest[(student_id, course_id)] = (lesson_id, viewed_at)
+
+    enrollments = []
+    candidates = Enrollment.objects.filter(
+        student_id__in=student_ids, course_id__in={course_id for _, course_id in latest}
+    ).only('id', 'student_id', 'course_id', 'last_lesson')
+    for enrollment in candidates:
+        lesson_id = latest.get((enrollment.student_id, enrollment.course_id), (None,))[0]
+        if lesson_id is not None and enrollment.last_lesson_id != lesson_id:
+            enrollment.last_lesson_id = lesson_id
+            enrollments.append(enrollment)
+
+    with transaction.atomic():
+        LessonProgress.objects.bulk_update(rows, ['watched_on'], batch_size=_flush_size())
+        Enrollment.objects.bulk_update(enrollments, ['last_lesson'], batch_size=_flush_size())
+
+    # A row that vanished (progress reset) is completed again on the next view.
+    found = {(row.student_id, row.lesson_id) for row in rows}
+    cache.delete_many([_marker_key(*pair) for pair in events if pair not in found])
+    return len(rows)
+
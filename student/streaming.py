@@ -0,0 +1,136 @@
+import hashlib
+import mimetypes
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+# Serving protected media files with HTTP Range support.
+#
+# Either the file is handed to the front-end server (X-Accel-Redirect for
+# nginx, X-Sendfile for Apache/lighttpd), which then answers ranges itself,
+# or Django answers with a FileResponse positioned at the requested range.
+# FileResponse lets WSGI servers with wsgi.file_wrapper (gunicorn, uWSGI)
+# use sendfile() from the current file position, so only the requested
+# bytes are read and they never pass through Python buffers.
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+HLS_CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+}
+
+
+class RangedFile:
+    # A file object limited to `length` bytes starting at `start`.
+
+    def __init__(self, fh, start, length):
+        self.fh = fh
+        self.remaining = length
+        fh.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.fh.fileno()
+
+    def close(self):
+        self.fh.close()
+
+
+def parse_range(header, size):
+    # Returns (start, end) inclusive, None to serve the whole file, or raises
+    # ValueError for an unsatisfiable range. Multi-range requests fall back
+    # to the whole file, which RFC 7233 allows.
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(0) == 'bytes=-':
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def file_validators(storage, name):
+    size = storage.size(name)
+    try:
+        modified = storage.get_modified_time(name).timestamp()
+    except (NotImplementedError, OSError):
+        modified = None
+    tag = hashlib.md5(f'{name}:{size}:{modified}'.encode()).hexdigest()
+    return size, quote_etag(tag), modified
+
+
+def _if_range_passes(request, etag, modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and modified is not None and int(modified) <= since
+
+
+def serve_file(request, field_file):
+    return serve_stored_file(request, field_file.storage, field_file.name)
+
+
+def serve_stored_file(request, storage, name, content_type=None, cache_control='private, max-age=3600'):
+    size, etag, modified = file_validators(storage, name)
+    content_type = content_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=modified and int(modified))
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    offload = getattr(settings, 'VIDEO_STREAM_OFFLOAD', '')
+    if offload:
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.VIDEO_ACCEL_REDIRECT_PREFIX + name
+        else:
+            response['X-Sendfile'] = storage.path(name)
+    else:
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range and not _if_range_passes(request, etag, modified):
+            byte_range = None
+
+        fh = storage.open(name, 'rb')
+        if byte_range:
+            start, end = byte_range
+            response = FileResponse(RangedFile(fh, start, end - start + 1), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+        else:
+            response = FileResponse(fh, content_type=content_type)
+            response['Content-Length'] = size
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified)
+    response['Cache-Control'] = cache_control
+    return response
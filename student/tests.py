@@ -1,3 +1,529 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from instructor.models import Choice, Course, Lesson, Question
+from .certificate_template import CertificateTemplate, certificate_template
+from .certificates import claim_certificate, request_certificate, run_pending_certificates
+from .counters import mark_lesson_completed, record_quiz_score, refresh_course_counters
+from instructor.quiz_cache import bump_quiz_version
+from .eligibility import course_eligibility
+from .grading import AnswerKey, grade, grade_submission, grade_submissions, prune_answer_log
+from .models import Certificate, Enrollment, LessonProgress, QuizAnswer, QuizScore
+from .progress import student_progress
+from .progress_buffer import flush_lesson_views, pending_views, record_lesson_view
+
+
+class StudentTestCase(TestCase):
+    def setUp(self):
+        caches['quiz'].clear()
+        caches['default'].clear()
+        self.instructor = CustomUser.objects.create_user(
+            username='teacher@example.com', email='teacher@example.com',
+            password='pass', role='instructor', is_approved=True,
+        )
+        self.student = CustomUser.objects.create_user(
+            username='student@example.com', email='student@example.com',
+            password='pass', role='student', is_approved=True,
+        )
+
+    def make_course(self, title, lesson_count):
+        course = Course.objects.create(
+            instructor=self.instructor, title=title, description='', category='dev',
+            thumbnail='course_thumbnails/x.png', approval_status='approved',
+        )
+        lessons = [Lesson.objects.create(course=course, title=f'{title} {i}') for i in range(lesson_count)]
+        Enrollment.objects.create(student=self.student, course=course)
+        refresh_course_counters(course.id)
+        course.refresh_from_db()
+        return course, lessons
+
+
+class StudentProgressTests(StudentTestCase):
+    def test_progress_and_next_lesson(self):
+        course, lessons = self.make_course('Python', 4)
+        for lesson in lessons[:2]:
+            mark_lesson_completed(self.student, lesson)
+        empty_course, _ = self.make_course('Empty', 0)
+        done_course, done_lessons = self.make_course('Done', 1)
+        mark_lesson_completed(self.student, done_lessons[0])
+
+        data = {row['course']: row for row in student_progress(self.student)}
+
+        self.assertEqual(data[course]['total_lessons'], 4)
+        self.assertEqual(data[course]['completed_lessons'], 2)
+        self.assertEqual(data[course]['progress'], 50)
+        self.assertEqual(data[course]['next_lesson'], lessons[2])
+        self.assertEqual(data[empty_course]['progress'], 0)
+        self.assertIsNone(data[empty_course]['next_lesson'])
+        self.assertEqual(data[done_course]['progress'], 100)
+        self.assertEqual(data[done_course]['next_lesson'], done_lessons[0])
+
+    def test_query_count_is_constant(self):
+        for i in range(10):
+            _, lessons = self.make_course(f'Course {i}', 5)
+            mark_lesson_completed(self.student, lessons[0])
+
+        with self.assertNumQueries(2):
+            data = student_progress(self.student)
+        self.assertEqual(len(data), 10)
+        self.assertTrue(all(row['progress'] == 20 for row in data))
+
+
+class ProgressCounterTests(StudentTestCase):
+    def test_counters_follow_writes(self):
+        course, lessons = self.make_course('Python', 3)
+        mark_lesson_completed(self.student, lessons[0])
+        mark_lesson_completed(self.student, lessons[0])
+        mark_lesson_completed(self.student, lessons[1])
+        record_quiz_score(self.student, lessons[0], 2, 2)
+        record_quiz_score(self.student, lessons[0], 2, 2)
+        record_quiz_score(self.student, lessons[1], 1, 2)
+
+        enrollment = Enrollment.objects.get(student=self.student, course=course)
+        self.assertEqual(enrollment.completed_lessons, 2)
+        self.assertEqual(enrollment.perfect_quizzes, 1)
+        self.assertEqual(enrollment.last_lesson, lessons[1])
+
+        record_quiz_score(self.student, lessons[0], 1, 2)
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.perfect_quizzes, 0)
+
+    def test_rebuild_command_repairs_drift(self):
+        course, lessons = self.make_course('Python', 2)
+        LessonProgress.objects.create(student=self.student, lesson=lessons[0], is_completed=True)
+
+        out = StringIO()
+        call_command('rebuild_progress_counters', stdout=out)
+        self.assertIn('All counters verified.', out.getvalue())
+
+        enrollment = Enrollment.objects.get(student=self.student, course=course)
+        self.assertEqual(enrollment.completed_lessons, 1)
+        self.assertEqual(enrollment.last_lesson, lessons[0])
+
+
+class QuizGradingTests(StudentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course, (self.lesson,) = self.make_course('Python', 1)
+        self.right, self.wrong = [], []
+        for i in range(20):
+            question = Question.objects.create(lesson=self.lesson, text=f'Q{i}')
+            self.right.append(Choice.objects.create(question=question, text='yes', is_correct=True))
+            self.wrong.append(Choice.objects.create(question=question, text='no'))
+
+    def post_data(self, choices):
+        return {f'question_{choice.question_id}': str(choice.id) for choice in choices}
+
+    def test_answer_key_is_one_query(self):
+        with self.assertNumQueries(1):
+            key = AnswerKey.for_lesson(self.lesson)
+        self.assertEqual(key.total, 20)
+
+    def test_grading_does_not_scale_with_questions(self):
+        AnswerKey.cached(self.lesson)
+        # Savepoint, previous score lookup, the insert in its own savepoint
+        # (a concurrent first submission re-reads instead of failing), release,
+        # one insert into the answer log; the key is cached.
+        data = self.post_data(self.right[:19] + self.wrong[19:])
+        data[f'latency_{self.right[0].question_id}'] = '1500'
+        data[f'latency_{self.right[1].question_id}'] = 'soon'
+        with self.assertNumQueries(7):
+            result = grade_submission(self.student, self.lesson, data)
+        self.assertEqual((result.score, result.total), (19, 20))
+        self.assertEqual(result.incorrect_answers, [
+            {'question': 'Q19', 'your_answer': 'no', 'correct_answer': 'yes'}
+        ])
+
+        answers = QuizAnswer.objects.filter(student=self.student).order_by('question_id')
+        self.assertEqual(len({answer.attempt for answer in answers}), 1)
+        self.assertEqual([answer.is_correct for answer in answers], [True] * 19 + [False])
+        self.assertEqual([answer.latency_ms for answer in answers[:3]], [1500, None, None])
+        self.assertEqual(answers[19].selected_choice_id, self.wrong[19].id)
+
+    def test_answer_log_is_pruned_by_age(self):
+        grade_submission(self.student, self.lesson, self.post_data(self.right))
+        grade_submission(self.student, self.lesson, self.post_data(self.wrong))
+        QuizAnswer.objects.filter(is_correct=True).update(answered_at=timezone.now() - timedelta(days=400))
+
+        self.assertEqual(prune_answer_log(365, batch_size=7), 20)
+        self.assertFalse(QuizAnswer.objects.filter(is_correct=True).exists())
+        self.assertEqual(QuizAnswer.objects.count(), 20)
+
+    def test_cached_key_follows_version_bumps(self):
+        self.assertEqual(AnswerKey.cached(self.lesson).total, 20)
+        Question.objects.create(lesson=self.lesson, text='Q20')
+        with self.assertNumQueries(0):
+            self.assertEqual(AnswerKey.cached(self.lesson).total, 20)
+
+        bump_quiz_version(self.lesson.id)
+        self.assertEqual(AnswerKey.cached(self.lesson).total, 21)
+
+    def test_choice_from_another_question_is_wrong(self):
+        key = AnswerKey.for_lesson(self.lesson)
+        answers = {self.right[0].question_id: self.right[1].id}
+        self.assertEqual(grade(key, answers).score, 0)
+
+    def test_bulk_grading(self):
+        other = CustomUser.objects.create_user(
+            username='other@example.com', email='other@example.com', password='pass', role='student',
+        )
+        Enrollment.objects.create(student=other, course=self.course)
+        perfect = {choice.question_id: choice.id for choice in self.right}
+
+        results = grade_submissions(self.lesson, [(self.student.id, perfect), (other.id, {})])
+        grade_submissions(self.lesson, [(self.student.id, perfect)])
+
+        self.assertTrue(results[self.student.id].is_perfect)
+        self.assertEqual(results[other.id].score, 0)
+        self.assertEqual(QuizScore.objects.filter(lesson=self.lesson).count(), 2)
+        self.assertEqual(Enrollment.objects.get(student=self.student).perfect_quizzes, 1)
+        self.assertEqual(Enrollment.objects.get(student=other).perfect_quizzes, 0)
+
+
+class CertificateJobTests(StudentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.course, _ = self.make_course('Python', 0)
+
+    def test_db_queue_renders_each_certificate_once(self):
+        with override_settings(CERTIFICATE_QUEUE='db', MEDIA_ROOT=self.media_root):
+            first = request_certificate(self.student, self.course)
+            second = request_certificate(self.student, self.course)
+            self.assertEqual(first.id, second.id)
+            self.assertEqual(second.status, 'pending')
+
+            self.assertEqual(run_pending_certificates(), 1)
+            self.assertEqual(run_pending_certificates(), 0)
+            self.assertFalse(claim_certificate(first.id))
+
+        cert = Certificate.objects.get()
+        self.assertEqual(cert.status, 'ready')
+        self.assertTrue(cert.certificate_file.name.endswith('.pdf'))
+
+    def test_book_shares_one_static_form(self):
+        buffer = BytesIO()
+        rows = [(f'Student {i}', timezone.now().date()) for i in range(3)]
+        self.assertEqual(CertificateTemplate('Python').render_book(rows, buffer), 3)
+        pdf = buffer.getvalue()
+        self.assertEqual(pdf.count(b'/Type /Page\n'), 3)
+        self.assertEqual(pdf.count(b'/Subtype /Form'), 1)
+
+    def test_render_reuses_the_cached_static_layer(self):
+        template = certificate_template('Python')
+        self.assertIs(certificate_template('Python'), template)
+        template.static_layer
+        with mock.patch.object(CertificateTemplate, '_draw_static', side_effect=AssertionError):
+            pdf = template.render('Ada Lovelace', timezone.now().date())
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(pdf.count(b'/Type /Page\n'), 1)
+
+    def test_issue_certificates_command(self):
+        lesson = Lesson.objects.create(course=self.course, title='Intro')
+        question = Question.objects.create(lesson=lesson, text='Q')
+        Choice.objects.create(question=question, text='yes', is_correct=True)
+        refresh_course_counters(self.course.id)
+        other = CustomUser.objects.create_user(
+            username='other@example.com', email='other@example.com', password='pass', role='student',
+        )
+        Enrollment.objects.create(student=other, course=self.course)
+        for student in (self.student, other):
+            mark_lesson_completed(student, lesson)
+        record_quiz_score(self.student, lesson, 1, 1)
+        record_quiz_score(other, lesson, 0, 1)
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            outputs = [StringIO(), StringIO()]
+            for out in outputs:
+                call_command('issue_certificates', processes=1, stdout=out)
+
+        self.assertIn('Queued 1 certificate(s).', outputs[0].getvalue())
+        self.assertIn('Queued 0 certificate(s).', outputs[1].getvalue())
+
+        cert = Certificate.objects.get()
+        self.assertEqual((cert.student, cert.status), (self.student, 'ready'))
+
+    def test_issue_certificates_only_touches_selected_courses(self):
+        other_course, _ = self.make_course('Rust', 0)
+        pending = Certificate.objects.create(student=self.student, course=other_course)
+        Certificate.objects.create(student=self.student, course=self.course, status='failed')
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            call_command('issue_certificates', processes=1, retry_failed=True,
+                         course_ids=[self.course.id], stdout=StringIO())
+
+        self.assertEqual(Certificate.objects.get(course=self.course).status, 'ready')
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, 'pending')
+
+    def test_request_restarts_a_job_whose_worker_died(self):
+        cert = Certificate.objects.create(student=self.student, course=self.course, status='processing')
+        with override_settings(CERTIFICATE_QUEUE='sync', MEDIA_ROOT=self.media_root):
+            self.assertEqual(request_certificate(self.student, self.course).status, 'processing')
+
+            Certificate.objects.filter(id=cert.id).update(updated_at=timezone.now() - timedelta(hours=1))
+            self.assertEqual(request_certificate(self.student, self.course).status, 'ready')
+
+    def test_status_endpoint(self):
+        self.client.force_login(self.student)
+        with override_settings(CERTIFICATE_QUEUE='db', MEDIA_ROOT=self.media_root):
+            response = self.client.get(f'/student/certificates/{self.course.id}/')
+            self.assertContains(response, 'being prepared')
+            self.assertEqual(self.client.get(f'/student/certificates/{self.course.id}/status/').json(),
+                             {'status': 'pending', 'url': None})
+
+            run_pending_certificates()
+            data = self.client.get(f'/student/certificates/{self.course.id}/status/').json()
+        self.assertEqual(data['status'], 'ready')
+        self.assertTrue(data['url'].endswith('.pdf'))
+
+
+class EligibilityTests(StudentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course, self.lessons = self.make_course('Python', 4)
+        for lesson in self.lessons:
+            question = Question.objects.create(lesson=lesson, text='Q')
+            Choice.objects.create(question=question, text='yes', is_correct=True)
+        refresh_course_counters(self.course.id)
+
+    def finish(self, lessons, score=1):
+        for lesson in lessons:
+            mark_lesson_completed(self.student, lesson)
+            record_quiz_score(self.student, lesson, score, 1)
+
+    def test_missing_and_imperfect_lessons_in_one_query(self):
+        self.finish(self.lessons[:2])
+        record_quiz_score(self.student, self.lessons[2], 0, 1)
+        with self.assertNumQueries(1):
+            eligibility = course_eligibility(self.student, self.course)
+        self.assertFalse(eligibility.eligible)
+        self.assertEqual(eligibility.incomplete, self.lessons[2:])
+        self.assertEqual(eligibility.imperfect, self.lessons[2:])
+
+        self.finish(self.lessons[2:])
+        self.assertTrue(course_eligibility(self.student, self.course).eligible)
+
+    def test_certificate_view_cost_does_not_grow_with_lessons(self):
+        self.finish(self.lessons[:3])
+        self.client.force_login(self.student)
+        response = self.client.get(f'/student/certificates/{self.course.id}/')
+        self.assertRedirects(response, '/student/dashboard/', fetch_redirect_response=False)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(f'/student/certificates/{self.course.id}/')
+        fact_queries = [q for q in ctx.captured_queries if 'student_quizscore' in q['sql']]
+        self.assertEqual(len(fact_queries), 1)
+
+    def test_dashboard_badge(self):
+        other, _ = self.make_course('Rust', 1)
+        self.finish(self.lessons)
+        with self.assertNumQueries(2):
+            data = {row['course']: row['certificate_eligible'] for row in student_progress(self.student)}
+        self.assertEqual(data, {self.course: True, other: False})
+
+        self.client.force_login(self.student)
+        response = self.client.get('/student/dashboard/')
+        self.assertContains(response, 'Eligible for certificate', count=1)
+        self.assertNotContains(response, 'Certificate ready')
+
+        certificate = Certificate.objects.create(student=self.student, course=self.course)
+        self.assertContains(self.client.get('/student/dashboard/'), 'Eligible for certificate', count=1)
+        certificate.status = 'ready'
+        certificate.save()
+        response = self.client.get('/student/dashboard/')
+        self.assertContains(response, 'Certificate ready', count=1)
+        self.assertNotContains(response, 'Eligible for certificate')
+
+
+class VideoStreamingTests(StudentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(MEDIA_ROOT=self.media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.course, (self.lesson,) = self.make_course('Video', 1)
+        self.video = bytes(range(256)) * 4
+        self.lesson.video_file.save('lecture.mp4', ContentFile(self.video))
+        self.url = f'/student/lesson/{self.lesson.id}/video/'
+        self.client.force_login(self.student)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_range_requests(self):
+        full = self.client.get(self.url)
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(self.body(full), self.video)
+
+        partial = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], f'bytes 100-199/{len(self.video)}')
+        self.assertEqual(self.body(partial), self.video[100:200])
+
+        tail = self.client.get(self.url, HTTP_RANGE='bytes=-24')
+        self.assertEqual(self.body(tail), self.video[-24:])
+
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=5000-').status_code, 416)
+
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_requires_enrollment(self):
+        Enrollment.objects.filter(student=self.student).delete()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+@override_settings(PROGRESS_FLUSH_INTERVAL=3600, PROGRESS_FLUSH_SIZE=10)
+class LessonViewBufferTests(StudentTestCase):
+    def setUp(self):
+        super().setUp()
+        # Views are only buffered in a store every worker shares.
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        overrides = override_settings(CACHES=dict(settings.CACHES, default={
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir,
+        }))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.course, self.lessons = self.make_course('Python', 3)
+
+    def enrollment(self):
+        return Enrollment.objects.get(student=self.student, course=self.course)
+
+    def test_first_view_writes_through_and_repeats_are_coalesced(self):
+        self.assertTrue(record_lesson_view(self.student, self.lessons[0]))
+        self.assertEqual(self.enrollment().completed_lessons, 1)
+        first_seen = LessonProgress.objects.get(lesson=self.lessons[0]).watched_on
+
+        record_lesson_view(self.student, self.lessons[1])
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                record_lesson_view(self.student, self.lessons[0])
+        self.assertEqual(pending_views(), 1)
+        self.assertEqual(self.enrollment().last_lesson, self.lessons[1])
+
+        self.assertEqual(flush_lesson_views(), 1)
+        self.assertGreater(LessonProgress.objects.get(lesson=self.lessons[0]).watched_on, first_seen)
+        enrollment = self.enrollment()
+        self.assertEqual((enrollment.completed_lessons, enrollment.last_lesson), (2, self.lessons[0]))
+
+    def test_unchanged_enrollment_is_not_written(self):
+        record_lesson_view(self.student, self.lessons[0])
+        record_lesson_view(self.student, self.lessons[0])
+        with CaptureQueriesContext(connection) as queries:
+            flush_lesson_views()
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('student_lessonprogress', updates[0])
+
+    def test_flushes_when_buffer_is_full(self):
+        for lesson in self.lessons:
+            record_lesson_view(self.student, lesson)
+        with self.settings(PROGRESS_FLUSH_SIZE=3):
+            for lesson in self.lessons:
+                record_lesson_view(self.student, lesson)
+        self.assertEqual(pending_views(), 0)
+
+    def test_old_views_are_flushed_by_the_next_request(self):
+        record_lesson_view(self.student, self.lessons[0])
+        record_lesson_view(self.student, self.lessons[0])
+        caches['default'].set('progress:views:since', timezone.now() - timedelta(hours=2), None)
+        record_lesson_view(self.student, self.lessons[1])
+        record_lesson_view(self.student, self.lessons[1])
+        self.assertEqual(pending_views(), 0)
+
+    def test_command_flushes_the_buffer(self):
+        record_lesson_view(self.student, self.lessons[0])
+        record_lesson_view(self.student, self.lessons[0])
+        out = StringIO()
+        call_command('flush_lesson_views', stdout=out)
+        self.assertIn('Updated 1 lesson progress row(s).', out.getvalue())
+        self.assertEqual(pending_views(), 0)
+
+    def test_process_local_cache_writes_through(self):
+        record_lesson_view(self.student, self.lessons[0])
+        with override_settings(CACHES=dict(settings.CACHES, default={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        })):
+            record_lesson_view(self.student, self.lessons[0])
+            self.assertEqual(pending_views(), 0)
+        self.assertEqual(self.enrollment().last_lesson, self.lessons[0])
+
+
+class EnrollmentCacheTests(StudentTestCase):
+    def setUp(self):
+        super().setUp()
+        # The session copy is only trusted with a cache shared by all workers.
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        overrides = override_settings(CACHES=dict(settings.CACHES, default={
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir,
+        }))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.course, (self.lesson,) = self.make_course('Python', 1)
+        self.client.force_login(self.student)
+
+    def enrollment_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        # The enrolled course ids, not the progress writes of the lesson view.
+        lookup = 'SELECT "student_enrollment"."course_id" FROM "student_enrollment"'
+        return response, [q['sql'] for q in queries.captured_queries if q['sql'].startswith(lookup)]
+
+    def test_enrollment_checks_are_cached_in_the_session(self):
+        url = f'/student/lesson/{self.lesson.id}/view/'
+        response, queries = self.enrollment_queries(url)
+        self.assertEqual((response.status_code, len(queries)), (200, 1))
+        response, queries = self.enrollment_queries(url)
+        self.assertEqual((response.status_code, queries), (200, []))
+
+    def test_enrolling_and_unenrolling_invalidate_the_cache(self):
+        other, (other_lesson,) = self.make_course('Rust', 1)
+        Enrollment.objects.filter(student=self.student, course=other).delete()
+        self.assertEqual(self.client.get(f'/student/lesson/{other_lesson.id}/quiz/').status_code, 302)
+
+        self.client.get(f'/student/courses/{other.id}/enroll/')
+        self.assertEqual(self.client.get(f'/student/lesson/{other_lesson.id}/quiz/').status_code, 200)
+
+        Enrollment.objects.filter(student=self.student, course=other).delete()
+        self.assertEqual(self.client.get(f'/student/lesson/{other_lesson.id}/quiz/').status_code, 302)
+
+    def test_missing_version_is_a_miss(self):
+        url = f'/student/lesson/{self.lesson.id}/view/'
+        self.enrollment_queries(url)
+        caches['default'].clear()
+        response, queries = self.enrollment_queries(url)
+        self.assertEqual((response.status_code, len(queries)), (200, 1))
+
+    def test_process_local_cache_is_not_trusted(self):
+        url = f'/student/lesson/{self.lesson.id}/view/'
+        with override_settings(CACHES=dict(settings.CACHES, default={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        })):
+            for _ in range(2):
+                response, queries = self.enrollment_queries(url)
+                self.assertEqual((response.status_code, len(queries)), (200, 1))
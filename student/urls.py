@@ -15,8 +15,11 @@ urlpatterns = [
 
     # Lessons & Quizzes
     path('lesson/<int:lesson_id>/view/', views.view_lesson, name='view_lesson'),
+    path('lesson/<int:lesson_id>/video/', views.stream_lesson_video, name='stream_lesson_video'),
+    path('lesson/<int:lesson_id>/hls/<path:name>', views.stream_lesson_hls, name='stream_lesson_hls'),
     path('lesson/<int:lesson_id>/quiz/', views.take_quiz, name='take_quiz'),
 
     # Certificates
     path('certificates/<int:course_id>/', views.student_certificates, name='student_certificates'),
+    path('certificates/<int:course_id>/status/', views.certificate_status, name='certificate_status'),
 ]
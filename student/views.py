@@ -1,49 +1,36 @@
-from io import BytesIO
+import posixpath
 
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
-from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from django.db.models import Q
-from django.http import FileResponse
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from django.utils.timezone import now, timezone
 
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib import colors
-
-from instructor.models import Course, Lesson, Question, Choice
-from .models import Enrollment, LessonProgress, Certificate, QuizScore
+from core.catalogue import COURSES_PER_PAGE, course_page
+from core.page_cache import cache_anonymous_page, cache_timeout
+from core.pagination import InvalidCursor
+from instructor.models import Course, Lesson
+from instructor.quiz_cache import get_quiz_questions
+from instructor.search import search_courses
+from techademy.replicas import read_replica
+from .models import Enrollment, LessonProgress, Certificate
 from .forms import StudentProfileForm
+from .progress import student_progress
+from .progress_buffer import record_lesson_view
+from .certificates import request_certificate
+from .grading import grade_submission
+from .eligibility import course_eligibility
+from .enrollments import forget_enrollments, is_enrolled
+from .streaming import HLS_CONTENT_TYPES, serve_file, serve_stored_file
 
 
 # Dashboard & Profile
 
 @login_required
 def student_dashboard(request):
-    enrollments = Enrollment.objects.filter(student=request.user).select_related('course')
-    dashboard_data = []
-
-    for enrollment in enrollments:
-        course = enrollment.course
-        lessons = course.lessons.all()
-        total_lessons = lessons.count()
-
-        completed_ids = LessonProgress.objects.filter(
-            student=request.user, lesson__in=lessons, is_completed=True
-        ).values_list('lesson_id', flat=True)
-
-        completed_count = len(completed_ids)
-        progress = int((completed_count / total_lessons) * 100) if total_lessons else 0
-        next_lesson = lessons.exclude(id__in=completed_ids).order_by('id').first() or lessons.first()
-
-        dashboard_data.append({
-            'course': course,
-            'progress': progress,
-            'next_lesson': next_lesson
-        })
+    dashboard_data = student_progress(request.user)
 
     return render(request, 'student/student_dashboard.html', {'enrollments': dashboard_data})
 
@@ -63,23 +50,33 @@ def edit_student_profile(request):
 
 # Course Browsing & Enrollment
 
+@cache_anonymous_page
+@read_replica
 def browse_courses(request):
-    query = request.GET.get('q', '')
-    courses = Course.objects.filter(approval_status='approved')
+    query = request.GET.get('q', '').strip()
 
     if query:
-        courses = courses.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(category__icontains=query)
-        )
-
-    return render(request, 'student/browse_courses.html', {'courses': courses, 'query': query})
+        # Search results are ordered by rank, not by a stable key, so they
+        # keep numbered pages over the lazily sliced result set.
+        page = Paginator(search_courses(query), COURSES_PER_PAGE).get_page(request.GET.get('page'))
+    else:
+        try:
+            page = course_page(request.GET.get('cursor') or None, COURSES_PER_PAGE)
+        except InvalidCursor:
+            page = course_page(per_page=COURSES_PER_PAGE)
+
+    return render(request, 'student/browse_courses.html', {
+        'courses': page.object_list,
+        'page': page,
+        'query': query,
+        'card_cache_timeout': cache_timeout(),
+    })
 
 
+@read_replica
 def course_detail_student(request, course_id):
     course = get_object_or_404(Course, id=course_id)
-    is_enrolled = Enrollment.objects.filter(course=course, student=request.user).exists()
+    enrolled = is_enrolled(request, course.id)
     lessons = Lesson.objects.filter(course=course)
 
     completed = LessonProgress.objects.filter(
@@ -88,7 +85,7 @@ def course_detail_student(request, course_id):
 
     return render(request, 'student/course_detail.html', {
         'course': course,
-        'is_enrolled': is_enrolled,
+        'is_enrolled': enrolled,
         'lessons': lessons,
         'completed_lessons': completed,
     })
@@ -97,8 +94,9 @@ def course_detail_student(request, course_id):
 @login_required
 def enroll_course(request, course_id):
     course = get_object_or_404(Course, id=course_id, approval_status='approved')
-    if not Enrollment.objects.filter(student=request.user, course=course).exists():
-        Enrollment.objects.create(student=request.user, course=course)
+    if not is_enrolled(request, course.id):
+        Enrollment.objects.get_or_create(student=request.user, course=course)
+        forget_enrollments(request)
         messages.success(request, 'Successfully enrolled in the course!')
     else:
         messages.info(request, 'You are already enrolled in this course.')
@@ -113,17 +111,13 @@ def view_lesson(request, lesson_id):
     lesson = get_object_or_404(Lesson, id=lesson_id)
     course = lesson.course
 
-    if not Enrollment.objects.filter(student=request.user, course=course).exists():
+    if not is_enrolled(request, course.id):
         messages.error(request, "You are not enrolled in this course.")
         return redirect('student_dashboard')
 
-    LessonProgress.objects.update_or_create(
-        student=request.user,
-        lesson=lesson,
-        defaults={'is_completed': True, 'watched_on': timezone.now()}
-    )
+    record_lesson_view(request.user, lesson)
 
-    questions = Question.objects.filter(lesson=lesson).prefetch_related('choices')
+    questions = get_quiz_questions(lesson.id)
 
     return render(request, 'student/view_lesson.html', {
         'lesson': lesson,
@@ -133,43 +127,61 @@ def view_lesson(request, lesson_id):
     })
 
 
+def _can_watch(request, lesson):
+    return lesson.course.instructor_id == request.user.id or is_enrolled(request, lesson.course_id)
+
+
+@login_required
+def stream_lesson_video(request, lesson_id):
+    lesson = get_object_or_404(Lesson.objects.select_related('course'), id=lesson_id)
+
+    if not _can_watch(request, lesson):
+        return HttpResponseForbidden("You are not enrolled in this course.")
+    if not lesson.video_file:
+        raise Http404("This lesson has no video file.")
+
+    return serve_file(request, lesson.video_file)
+
+
+@login_required
+def stream_lesson_hls(request, lesson_id, name):
+    lesson = get_object_or_404(Lesson.objects.select_related('course'), id=lesson_id, hls_status='ready')
+
+    if not _can_watch(request, lesson):
+        return HttpResponseForbidden("You are not enrolled in this course.")
+
+    # Playlists reference renditions and segments relative to the master
+    # playlist, so only files below its directory are served.
+    base = posixpath.dirname(lesson.hls_manifest)
+    path = posixpath.normpath(posixpath.join(base, name))
+    content_type = HLS_CONTENT_TYPES.get(posixpath.splitext(path)[1])
+    if not path.startswith(base + '/') or content_type is None or not default_storage.exists(path):
+        raise Http404("No such HLS file.")
+
+    # Each transcode writes to a new directory, so its files never change.
+    return serve_stored_file(request, default_storage, path, content_type, cache_control='private, max-age=86400')
+
+
 @login_required
 def take_quiz(request, lesson_id):
     lesson = get_object_or_404(Lesson, id=lesson_id)
-    questions = Question.objects.filter(lesson=lesson).prefetch_related('choices')
-    total = questions.count()
-    correct = 0
-    incorrect_answers = []
+
+    if not is_enrolled(request, lesson.course_id):
+        messages.error(request, "You are not enrolled in this course.")
+        return redirect('student_dashboard')
 
     if request.method == 'POST':
-        for question in questions:
-            selected_id = request.POST.get(f'question_{question.id}')
-            selected_choice = Choice.objects.filter(id=selected_id).first() if selected_id else None
-            correct_choice = question.choices.filter(is_correct=True).first()
-
-            if selected_choice and selected_choice.is_correct:
-                correct += 1
-            else:
-                incorrect_answers.append({
-                    'question': question.text,
-                    'your_answer': selected_choice.text if selected_choice else "No answer",
-                    'correct_answer': correct_choice.text if correct_choice else "N/A"
-                })
-
-        QuizScore.objects.update_or_create(
-            student=request.user,
-            lesson=lesson,
-            defaults={'score': correct, 'total': total, 'is_perfect': correct == total}
-        )
+        result = grade_submission(request.user, lesson, request.POST)
 
         return render(request, 'student/quiz_result.html', {
-            'score': correct,
-            'total': total,
-            'incorrect_answers': incorrect_answers,
-            'is_perfect': correct == total,
+            'score': result.score,
+            'total': result.total,
+            'incorrect_answers': result.incorrect_answers,
+            'is_perfect': result.is_perfect,
             'course': lesson.course
         })
 
+    questions = get_quiz_questions(lesson.id)
     return render(request, 'student/take_quiz.html', {'lesson': lesson, 'questions': questions})
 
 
@@ -178,81 +190,35 @@ def take_quiz(request, lesson_id):
 @login_required
 def student_certificates(request, course_id):
     course = get_object_or_404(Course, id=course_id)
-    lessons = Lesson.objects.filter(course=course)
-    total_lessons = lessons.count()
 
-    completed = LessonProgress.objects.filter(
-        student=request.user, lesson__in=lessons, is_completed=True
-    ).count()
-
-    if completed < total_lessons:
+    if not is_enrolled(request, course.id):
         messages.error(request, "Please complete all lessons before requesting a certificate.")
         return redirect('student_dashboard')
 
-    for lesson in lessons:
-        total_qs = Question.objects.filter(lesson=lesson).count()
-        score_obj = QuizScore.objects.filter(student=request.user, lesson=lesson).first()
-
-        if not score_obj or score_obj.score < total_qs:
-            messages.error(request, f"You must score full marks in the quiz for: {lesson.title}")
-            return redirect('student_dashboard')
-
-    cert, created = Certificate.objects.get_or_create(student=request.user, course=course)
-
-    if not cert.certificate_file:
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=landscape(A4))
-        width, height = landscape(A4)
-
-        # Certificate Design
-        p.setStrokeColor(colors.HexColor("#00C6FF"))
-        p.setLineWidth(6)
-        p.rect(40, 40, width - 80, height - 80)
-
-        p.setFont("Helvetica-Bold", 36)
-        p.setFillColor(colors.HexColor("#00C6FF"))
-        p.drawCentredString(width / 2, height - 100, "Certificate of Completion")
-
-        p.setFont("Helvetica", 18)
-        p.setFillColor(colors.black)
-        p.drawCentredString(width / 2, height - 160, "This is to certify that")
-
-        p.setFont("Helvetica-Bold", 26)
-        p.setFillColor(colors.darkblue)
-        p.drawCentredString(width / 2, height - 210, request.user.get_full_name())
-
-        p.setFont("Helvetica", 18)
-        p.setFillColor(colors.black)
-        p.drawCentredString(width / 2, height - 260, "has successfully completed the course")
-
-        p.setFont("Helvetica-Bold", 24)
-        p.setFillColor(colors.HexColor("#0072ff"))
-        p.drawCentredString(width / 2, height - 310, course.title)
-
-        p.setFont("Helvetica", 14)
-        p.setFillColor(colors.gray)
-        p.drawCentredString(width / 2, height - 370, f"Issued on: {now().strftime('%d %B %Y')}")
-
-        p.setFont("Helvetica-Oblique", 12)
-        p.setFillColor(colors.gray)
-        p.drawString(100, 80, "Signature:")
-        p.line(160, 82, 300, 82)
-
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-
-        cert.certificate_file.save(
-            f'{request.user.username}_{course.title}_certificate.pdf',
-            ContentFile(buffer.read())
-        )
-        cert.save()
+    eligibility = course_eligibility(request.user, course)
+    if eligibility.incomplete:
+        messages.error(request, "Please complete all lessons before requesting a certificate.")
+        return redirect('student_dashboard')
+    if eligibility.imperfect:
+        titles = ', '.join(lesson.title for lesson in eligibility.imperfect)
+        messages.error(request, f"You must score full marks in the quiz for: {titles}")
+        return redirect('student_dashboard')
 
-    cert_url = default_storage.url(cert.certificate_file.name)
+    cert = request_certificate(request.user, course)
 
     return render(request, 'student/certificate_success.html', {
         'course': course,
-        'certificate_url': cert_url
+        'certificate': cert,
+        'certificate_url': cert.certificate_file.url if cert.status == 'ready' else None,
+    })
+
+
+@login_required
+def certificate_status(request, course_id):
+    cert = get_object_or_404(Certificate, student=request.user, course_id=course_id)
+    return JsonResponse({
+        'status': cert.status,
+        'url': cert.certificate_file.url if cert.status == 'ready' else None,
     })
 
 @login_required
@@ -264,6 +230,7 @@ def start_payment(request, course_id):
 
     if request.method == "POST":
         Enrollment.objects.get_or_create(student=request.user, course=course)
+        forget_enrollments(request)
         messages.success(request, "Payment successful! You're now enrolled.")
         return redirect('student_dashboard')
 
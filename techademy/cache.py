@@ -0,0 +1,63 @@
+import os
+from urllib.parse import parse_qsl, unquote, urlparse
+
+from django.conf import settings
+
+
+# Cache configuration from the environment, and helpers shared by the apps.
+#
+# CACHE_URL selects the backend of the 'default' cache:
+#
+#   redis://:password@host:6379/0        (or rediss://, via django-redis)
+#   memcached://host1:11211,host2:11211
+#   file:///absolute/path/to/dir
+#   locmem://name                         (per-process, the default)
+#
+# Several caches are invalidated by writing a new version token or deleting
+# a key when data changes. That only works when every worker reads the same
+# store: a bump in one process's LocMemCache never reaches the others, which
+# keep serving what they cached. is_shared_cache() tells callers whether an
+# alias may hold such entries; the per-process backends below may not.
+
+BACKENDS = {
+    'redis': 'django_redis.cache.RedisCache',
+    'rediss': 'django_redis.cache.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+LOCAL_CACHE_BACKENDS = (BACKENDS['locmem'], BACKENDS['dummy'])
+
+
+def parse_cache_url(url):
+    parsed = urlparse(url)
+    if parsed.scheme not in BACKENDS:
+        raise ValueError(f"Unsupported CACHE_URL scheme: {parsed.scheme!r}")
+
+    config = {'BACKEND': BACKENDS[parsed.scheme]}
+    if parsed.scheme in ('redis', 'rediss'):
+        # django-redis reads the database number and options from the URL.
+        config['LOCATION'] = url
+        return config
+
+    if parsed.scheme == 'file':
+        config['LOCATION'] = unquote(parsed.path)
+    elif parsed.scheme == 'memcached':
+        config['LOCATION'] = parsed.netloc.split(',')
+    elif parsed.scheme == 'locmem':
+        config['LOCATION'] = parsed.netloc
+    options = dict(parse_qsl(parsed.query))
+    if options:
+        config['OPTIONS'] = options
+    return config
+
+
+def cache_from_env(environ=os.environ):
+    url = environ.get('CACHE_URL')
+    return parse_cache_url(url) if url else {'BACKEND': BACKENDS['locmem']}
+
+
+def is_shared_cache(alias='default'):
+    return settings.CACHES[alias]['BACKEND'] not in LOCAL_CACHE_BACKENDS
@@ -0,0 +1,114 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+
+# Read-replica routing.
+#
+# Reads only go to a replica inside views decorated with @read_replica, and
+# only for GET/HEAD requests; everything else, including every write, uses
+# 'default'. A request that writes sets a short-lived cookie, and while it
+# is present the user's requests read from the primary too, so their own
+# changes (a new enrollment, an approved course) are visible right away
+# despite replication lag. Replicas are listed in settings.DATABASE_REPLICAS.
+#
+# Only writes to domain models pin. Session saves, admin log entries and
+# the last_login stamp written at login are bookkeeping the user never reads
+# back, and counting them would pin every logged-in user to the primary.
+
+BOOKKEEPING_APPS = {'sessions', 'admin', 'contenttypes'}
+
+PIN_COOKIE = 'db_primary_until'
+
+_state = ContextVar('replica_state', default=None)
+
+
+class _RequestState:
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+        self.bookkeeping = False
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.pinned or state.wrote:
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and not state.bookkeeping and model._meta.app_label not in BOOKKEEPING_APPS:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+@contextmanager
+def bookkeeping():
+    # Writes made inside this block don't pin the user to the primary.
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous, state.bookkeeping = state.bookkeeping, True
+    try:
+        yield
+    finally:
+        state.bookkeeping = previous
+
+
+class ReplicaPinMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned = float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        state = _RequestState(pinned)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote and replicas():
+            lag = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+            response.set_cookie(PIN_COOKIE, str(time.time() + lag), max_age=lag, httponly=True, samesite='Lax')
+        return response
+
+
+def read_replica(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _state.get()
+        available = replicas()
+        if state is None or not available or request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        state.replica = random.choice(available)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            state.replica = None
+    return wrapper
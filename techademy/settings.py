@@ -10,8 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
+import hashlib
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache import cache_from_env
+from .db import database_from_env, replicas_from_env
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -46,10 +52,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'techademy.replicas.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.user_cache.CachedAuthenticationMiddleware',
+    'core.access.RoleAccessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -78,12 +86,109 @@ WSGI_APPLICATION = 'techademy.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# Configured from DATABASE_URL (PostgreSQL or SQLite), see techademy/db.py.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    'default': database_from_env(os.path.join(BASE_DIR, 'db.sqlite3')),
+    **replicas_from_env(),
 }
+DATABASE_HEALTH_CHECKS = os.environ.get('DATABASE_HEALTH_CHECKS', '1') == '1'
+DATABASE_HEALTH_CHECK_IDLE = int(os.environ.get('DATABASE_HEALTH_CHECK_IDLE', 30))
+
+# Catalogue and reporting views read from these aliases (techademy.replicas)
+# unless the user wrote something in the last REPLICA_PIN_SECONDS.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['techademy.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
+
+# Caches
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+#
+# The 'default' cache comes from CACHE_URL (see techademy.cache) and is a
+# per-process LocMemCache without it. Sessions in the cache, the user and
+# enrollment caches and the catalogue page cache all need a store shared by
+# every worker (redis, memcached, or file on a single host); they switch
+# themselves off on a per-process one (page caching only outside DEBUG).
+#
+# The 'quiz' cache holds per-lesson quiz content and the version stamps that
+# invalidate it (see instructor.quiz_cache), so every worker must see the same
+# store. QUIZ_CACHE_BACKEND picks it: 'file' (default, shared by the workers
+# on one host), 'redis' (any Redis-compatible server, via django-redis and
+# REDIS_URL) or 'locmem', which is per-process and only allowed with DEBUG.
+# Keys are prefixed with the database they describe, so databases sharing a
+# store (or a new database under another name) never see each other's quizzes;
+# the test runner (techademy.test_runner) swaps in a private locmem store.
+
+QUIZ_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quiz',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'quiz'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+QUIZ_CACHE_BACKEND = os.environ.get('QUIZ_CACHE_BACKEND', 'file')
+if QUIZ_CACHE_BACKEND == 'locmem' and not DEBUG:
+    raise ImproperlyConfigured("QUIZ_CACHE_BACKEND=locmem is per-process; use 'file' or 'redis'")
+
+CACHES = {
+    'default': cache_from_env(),
+    'quiz': dict(QUIZ_CACHE_BACKENDS[QUIZ_CACHE_BACKEND], KEY_PREFIX=hashlib.md5(
+        f"{DATABASES['default'].get('HOST', '')}/{DATABASES['default']['NAME']}".encode()
+    ).hexdigest()[:12]),
+}
+TEST_RUNNER = 'techademy.test_runner.TestRunner'
+
+
+# Sessions and the authenticated-user cache
+# SESSION_STORE picks where sessions live: 'db' (default), 'cache',
+# 'cached_db' (cache in front of the table) or 'signed_cookies'. The cache
+# stores use SESSION_CACHE_ALIAS, which must be shared between processes
+# (redis) in production. request.user is cached in USER_CACHE_ALIAS for
+# USER_CACHE_TIMEOUT seconds (accounts.user_cache) when that alias is shared
+# between processes; with a cache store both per-request queries go away.
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_STORE', 'db')]
+SESSION_CACHE_ALIAS = 'default'
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', 300))
+
+# Anonymous catalogue pages and course/instructor card fragments
+# (core.page_cache); purged by moderation and edits, this is only an upper bound.
+CATALOGUE_CACHE_TIMEOUT = int(os.environ.get('CATALOGUE_CACHE_TIMEOUT', 600))
+
+
+# Certificates
+# How certificate PDFs are rendered: 'thread' (in-process worker pool),
+# 'db' (rows are polled by `manage.py run_certificate_worker`) or 'sync'.
+
+CERTIFICATE_QUEUE = os.environ.get('CERTIFICATE_QUEUE', 'thread')
+CERTIFICATE_WORKERS = int(os.environ.get('CERTIFICATE_WORKERS', 2))
+
+# Repeat lesson views are buffered in the (shared) default cache and written
+# in batches of PROGRESS_FLUSH_SIZE or after PROGRESS_FLUSH_INTERVAL seconds
+# (student.progress_buffer); run `manage.py flush_lesson_views` every minute
+# or so from cron as well. 0 writes every view immediately.
+PROGRESS_FLUSH_INTERVAL = int(os.environ.get('PROGRESS_FLUSH_INTERVAL', 30))
+PROGRESS_FLUSH_SIZE = 500
+
+# Per-question quiz answers (student.QuizAnswer) are kept this long by
+# `manage.py prune_quiz_answers`; item statistics cover the same window.
+QUIZ_ANSWER_RETENTION_DAYS = int(os.environ.get('QUIZ_ANSWER_RETENTION_DAYS', 365))
 
 
 # Password validation
@@ -129,4 +234,30 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-AUTH_USER_MODEL = 'accounts.CustomUser'
\ No newline at end of file
+# Partial files of chunked lesson video uploads (see instructor.uploads).
+VIDEO_UPLOAD_TEMP_DIR = os.environ.get('VIDEO_UPLOAD_TEMP_DIR', os.path.join(BASE_DIR, 'uploads_tmp'))
+VIDEO_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Lesson videos are streamed through an enrollment check (student.streaming).
+# Set VIDEO_STREAM_OFFLOAD to 'x-accel-redirect' (nginx, with an internal
+# location at VIDEO_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT) or
+# 'x-sendfile' to let the front-end server send the bytes.
+VIDEO_STREAM_OFFLOAD = os.environ.get('VIDEO_STREAM_OFFLOAD', '')
+VIDEO_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# HLS renditions of lesson videos (instructor.transcoding), produced by
+# `manage.py run_transcode_worker`. 'ffmpeg' is skipped when the binary is
+# missing, 'stub' writes placeholder segments, '' disables transcoding.
+VIDEO_TRANSCODER = os.environ.get('VIDEO_TRANSCODER', 'ffmpeg')
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+HLS_SEGMENT_SECONDS = 6
+
+AUTH_USER_MODEL = 'accounts.CustomUser'
+LOGIN_URL = 'login'
+
+# URL trees restricted to one role (core.access.RoleAccessMiddleware).
+ACCESS_RULES = [
+    ('/adminpanel/', 'admin'),
+    ('/instructor/', 'instructor'),
+]
+ACCESS_PUBLIC_VIEWS = ['register_instructor']
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    # The configured quiz store outlives the test database (a file cache in
+    # BASE_DIR/cache by default), so tests get a private in-process one.
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._quiz_cache = override_settings(CACHES=dict(settings.CACHES, quiz={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'quiz-tests',
+        }))
+        self._quiz_cache.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._quiz_cache.disable()
+        super().teardown_test_environment(**kwargs)
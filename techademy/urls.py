@@ -1,13 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
-from core.views import homepage
 from accounts.views import login_view
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', homepage, name='homepage'),
+    path('', include('core.urls')),
     path('login/', login_view, name='login'),
     path('register/', include('accounts.urls')),
     path('student/', include('student.urls')),